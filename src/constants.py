@@ -6,3 +6,7 @@ SCORE_GRADES = {
     'D':(60,69),
     'F':(0,59),
 }
+
+PASSING_AVERAGE = 60
+PASSING_ATTENDANCE = 75
+MAX_ATTENDANCE = 30
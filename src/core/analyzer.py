@@ -1,100 +1,325 @@
 import numpy as np
 
-# Not fully completed, activity levels by steps is not implemented
+from .cleaning import clean_batched, clean_out_of_core, cleaning_fences, iter_cleaned_blocks
+from .compact import STORAGE_DTYPES, CompactTensor
+from .covariance import CovarianceAccumulator
+from .dataset import DEFAULT_BLOCK_USERS, ActivityDataset, create_dataset, iter_user_blocks
+from .goals import Goal, GoalEngine, GoalResults
+from .profiling import stage
+from .rolling import rolling_mean
+from .segments import Segmentation, SegmentTable, activity_levels, age_bands, categories, cross_tab
+from .selection import top_k_indices, bottom_k_indices
 
-np.random.seed(42)
+DEFAULT_GOALS = {"steps": 8000, "calories": 2000, "active_minutes": 60}
+CONSISTENT_GOAL_RATE = 80
 
-n_users = 100
-n_days = 90
-n_metrics = 4 
 
-# Generate realistic data
-daily_steps = np.random.randint(2000, 15001, size=(n_users, n_days))
-calories = np.random.randint(1500, 3501, size=(n_users, n_days))
-active_minutes = np.random.randint(20, 181, size=(n_users, n_days))
-avg_heart_rate = np.random.randint(60, 121, size=(n_users, n_days))
+def generate_activity_data(n_users=100, n_days=90, seed=42):
+    # Synthetic tracker data: 4 metrics per user and day, ~5% NaNs and ~2% x10 outliers
+    rng = np.random.RandomState(seed)
 
-# Combine metrics 
-data = np.stack([daily_steps, calories, active_minutes, avg_heart_rate], axis=2)
+    # Generate realistic data
+    daily_steps = rng.randint(2000, 15001, size=(n_users, n_days))
+    calories = rng.randint(1500, 3501, size=(n_users, n_days))
+    active_minutes = rng.randint(20, 181, size=(n_users, n_days))
+    avg_heart_rate = rng.randint(60, 121, size=(n_users, n_days))
 
-#  NaNs 
-nan_mask = np.random.rand(*data.shape) < 0.05
-data = data.astype(float)
-data[nan_mask] = np.nan
+    # Combine metrics 
+    data = np.stack([daily_steps, calories, active_minutes, avg_heart_rate], axis=2)
 
-#  outliers 
-outlier_mask = np.random.rand(*data.shape) < 0.02
-data[outlier_mask] *= 10 
+    #  NaNs 
+    nan_mask = rng.rand(*data.shape) < 0.05
+    data = data.astype(float)
+    data[nan_mask] = np.nan
 
-# User metadata
-user_metadata = np.zeros((n_users, 3))
-user_metadata[:, 0] = np.arange(1, n_users+1)  
-user_metadata[:, 1] = np.random.randint(18, 71, size=n_users)  
-user_metadata[:, 2] = np.random.randint(0, 2, size=n_users)  
+    #  outliers 
+    outlier_mask = rng.rand(*data.shape) < 0.02
+    data[outlier_mask] *= 10 
 
+    # User metadata
+    user_metadata = np.zeros((n_users, 3))
+    user_metadata[:, 0] = np.arange(1, n_users+1)  
+    user_metadata[:, 1] = rng.randint(18, 71, size=n_users)  
+    user_metadata[:, 2] = rng.randint(0, 2, size=n_users)  
 
+    return ActivityDataset(data, user_metadata)
 
-def handle_missing(data):
-    # Replace NaN 
-    for m in range(data.shape[2]):
-        col_mean = np.nanmean(data[:, :, m])
-        nan_idx = np.isnan(data[:, :, m])
-        data[nan_idx, m] = col_mean if np.isscalar(col_mean) else col_mean
-    return data
 
-def remove_outliers(data, metric_index):
-    metric_data = data[:, :, metric_index]
-    Q1 = np.percentile(metric_data, 25)
-    Q3 = np.percentile(metric_data, 75)
-    IQR = Q3 - Q1
-    low = Q1 - 1.5 * IQR
-    high = Q3 + 1.5 * IQR
-    outliers = (metric_data < low) | (metric_data > high)
-    median = np.median(metric_data)
-    metric_data[outliers] = median
-    data[:, :, metric_index] = metric_data
-    return data
+def summarize_users(data, block_users=DEFAULT_BLOCK_USERS):
+    # Per-user mean and std over days, one block of users at a time so a
+    # memory-mapped tensor is never resident as a whole
+    n_users, _, n_metrics = data.shape
+    means = np.empty((n_users, n_metrics))
+    stds = np.empty((n_users, n_metrics))
+    for start, block in iter_user_blocks(data, block_users):
+        means[start:start + len(block)] = block.mean(axis=1)
+        stds[start:start + len(block)] = block.std(axis=1)
+    return means, stds
 
-for m in range(n_metrics):
-    data = remove_outliers(data, m)
-data = handle_missing(data)
+def population_daily_mean(data, block_users=DEFAULT_BLOCK_USERS):
+    # Mean over users for every (day, metric), accumulated block by block
+    total = np.zeros(data.shape[1:])
+    for _, block in iter_user_blocks(data, block_users):
+        total += block.sum(axis=0)
+    return total / data.shape[0]
 
+def goal_achievement(data, goals, block_users=DEFAULT_BLOCK_USERS):
+    # Percentage of days each user meets every (metric_index, minimum) goal
+    rates = np.empty(data.shape[0])
+    for start, block in iter_user_blocks(data, block_users):
+        mask = np.ones(block.shape[:2], dtype=bool)
+        for metric_index, minimum in goals:
+            mask &= block[:, :, metric_index] >= minimum
+        rates[start:start + len(block)] = mask.sum(axis=1) / data.shape[1] * 100
+    return rates
 
 
-# metrics per user
-avg_metrics_per_user = data.mean(axis=1)
+def metric_correlation(data, block_users=DEFAULT_BLOCK_USERS):
+    # Correlation between metrics over all user-days, streamed over user blocks
+    accumulator = CovarianceAccumulator(data.shape[2])
+    for _, block in iter_user_blocks(data, block_users):
+        accumulator.update(block.reshape(-1, data.shape[2]))
+    return accumulator.correlation()
 
-# Z-score for all metrics per user
-z_scores = (avg_metrics_per_user - avg_metrics_per_user.mean(axis=0)) / avg_metrics_per_user.std(axis=0)
-combined_z = z_scores.sum(axis=1)
-top_10_users = np.argsort(-combined_z)[:10]
 
-# Users with lowest std deviation
-user_std = data.std(axis=1).sum(axis=1)
-most_consistent_users = np.argsort(user_std)[:10]
+def cached_stage(method):
+    # Read-only property computed on first access and kept until invalidated
+    name = method.__name__
 
+    def getter(self):
+        return self._memo(name, lambda: method(self))
 
+    getter.__doc__ = method.__doc__
+    return property(getter)
 
-# 7-day rolling averages for population metrics
-rolling_avg = np.array([
-    np.convolve(data[:, :, m].mean(axis=0), np.ones(7)/7, mode='valid')
-    for m in range(n_metrics)
-]).T
 
-# Correlation matrix 
-corr_matrix = np.corrcoef(data.reshape(-1, n_metrics).T)
+def analysis_option(name):
+    # Settable option every stage depends on: changing it clears the whole cache
+    attribute = "_" + name
 
-# Goal achievement
-steps_goal = 8000
-calories_goal = 2000
-active_minutes_goal = 60
-goal_mask = (data[:, :, 0] >= steps_goal) & (data[:, :, 1] >= calories_goal) & (data[:, :, 2] >= active_minutes_goal)
-goal_achievement_rate = goal_mask.sum(axis=1) / n_days * 100
-consistent_goal_users = np.where(goal_achievement_rate > 80)[0]
+    def getter(self):
+        return getattr(self, attribute)
 
+    def setter(self, value):
+        previous = getattr(self, attribute)
+        setattr(self, attribute, value)
+        try:
+            self._check_options()
+        except ValueError:
+            setattr(self, attribute, previous)
+            raise
+        self.invalidate()
 
-print("=== Fitness Tracker Report ===\n")
-print("Top 10 most active users:", top_10_users + 1)
-print("Most consistent users:", most_consistent_users + 1)
-print("Correlation matrix between metrics:\n", corr_matrix)
-print("Number of users consistently meeting all goals (>80% days):", len(consistent_goal_users))
+    return property(getter, setter)
+
+
+class ActivityAnalyzer:
+    """Lazily computed analytics over an ActivityDataset.
+
+    Every derived quantity is computed on first access and memoized, so a
+    caller only pays for what it reads. Replacing the dataset clears the
+    whole cache, as does changing per_user_cleaning, cleaned_path,
+    block_users or storage; replacing the goals clears only the goal results.
+    With cleaned_path, cleaning runs out of core into a new dataset file.
+    With storage="float32", "int16" or "uint16" the cleaned tensor is kept
+    as a CompactTensor and decoded to float64 block by block."""
+
+    _GOAL_STAGES = ("goal_achievement_rate", "segments")
+
+    def __init__(
+        self,
+        dataset: ActivityDataset,
+        goals: dict[str, float] = DEFAULT_GOALS,
+        per_user_cleaning: bool = False,
+        cleaned_path=None,
+        block_users: int = DEFAULT_BLOCK_USERS,
+        storage: str = "float64",
+    ):
+        self._cache = {}
+        self._dataset = dataset
+        self._goals = dict(goals)
+        self._per_user_cleaning = per_user_cleaning
+        self._cleaned_path = cleaned_path
+        self._block_users = block_users
+        self._storage = storage
+        self._check_options()
+
+    per_user_cleaning = analysis_option("per_user_cleaning")
+    cleaned_path = analysis_option("cleaned_path")
+    block_users = analysis_option("block_users")
+    storage = analysis_option("storage")
+
+    def _check_options(self):
+        if self._per_user_cleaning and self._cleaned_path is not None:
+            raise ValueError("out-of-core cleaning only supports population statistics")
+        if self._storage != "float64" and self._storage not in STORAGE_DTYPES:
+            raise ValueError(f"storage must be 'float64' or one of {sorted(STORAGE_DTYPES)}")
+
+    @property
+    def dataset(self) -> ActivityDataset:
+        return self._dataset
+
+    @dataset.setter
+    def dataset(self, dataset: ActivityDataset):
+        self._dataset = dataset
+        self.invalidate()
+
+    @property
+    def goals(self) -> dict[str, float]:
+        return dict(self._goals)
+
+    @goals.setter
+    def goals(self, goals: dict[str, float]):
+        self._goals = dict(goals)
+        self.invalidate(*self._GOAL_STAGES)
+
+    def invalidate(self, *stages: str):
+        """Drop cached results: the given stages, or everything."""
+        if not stages:
+            self._cache.clear()
+            return
+        for key in list(self._cache):
+            name = key[0] if isinstance(key, tuple) else key
+            if name in stages:
+                del self._cache[key]
+
+    def _memo(self, key, compute):
+        if key not in self._cache:
+            # Recorded at the top level: whichever result is read first triggers the computation
+            with stage(key[0] if isinstance(key, tuple) else key, root=True):
+                self._cache[key] = compute()
+        return self._cache[key]
+
+    @cached_stage
+    def cleaned_data(self) -> np.ndarray | CompactTensor:
+        """Tensor with outliers replaced by the median and NaNs imputed."""
+        data = self._dataset.data
+        if self.cleaned_path is None:
+            if self.storage == "float64":
+                return clean_batched(data, per_user=self.per_user_cleaning)
+            # Encode each cleaned block as it is produced; the float64 result never exists whole
+            fences = cleaning_fences(data, self.per_user_cleaning, self.block_users)
+            return CompactTensor.from_blocks(
+                lambda users: iter_cleaned_blocks(data, self.per_user_cleaning, users, fences),
+                data.shape, self.storage, self.block_users,
+            )
+        target = create_dataset(
+            self.cleaned_path, data.shape, self._dataset.user_metadata,
+            self._dataset.metric_names, self._dataset.metadata_columns, data.dtype,
+        )
+        cleaned, _ = clean_out_of_core(data, target.data, self.block_users)
+        if self.storage == "float64":
+            return cleaned
+        return CompactTensor.encode(cleaned, self.storage, self.block_users)
+
+    @cached_stage
+    def _user_summary(self) -> tuple[np.ndarray, np.ndarray]:
+        return summarize_users(self.cleaned_data, self.block_users)
+
+    @property
+    def user_means(self) -> np.ndarray:
+        """Mean of every metric per user, shape (users, metrics)."""
+        return self._user_summary[0]
+
+    @property
+    def user_std(self) -> np.ndarray:
+        """Std of every metric per user, shape (users, metrics)."""
+        return self._user_summary[1]
+
+    @cached_stage
+    def z_scores(self) -> np.ndarray:
+        """Per-user means standardised across the population."""
+        means = self.user_means
+        return (means - means.mean(axis=0)) / means.std(axis=0)
+
+    @cached_stage
+    def combined_z(self) -> np.ndarray:
+        """Sum of a user's z-scores over all metrics."""
+        return self.z_scores.sum(axis=1)
+
+    @cached_stage
+    def variability(self) -> np.ndarray:
+        """Sum of a user's per-metric std deviations."""
+        return self.user_std.sum(axis=1)
+
+    def top_users(self, n: int = 10) -> np.ndarray:
+        """Indices of the n most active users by combined z-score."""
+        return top_k_indices(self.combined_z, n)
+
+    def most_consistent_users(self, n: int = 10) -> np.ndarray:
+        """Indices of the n users with the lowest variability."""
+        return bottom_k_indices(self.variability, n)
+
+    @cached_stage
+    def daily_means(self) -> np.ndarray:
+        """Population mean per (day, metric)."""
+        return population_daily_mean(self.cleaned_data, self.block_users)
+
+    def rolling_avg(self, window: int = 7) -> np.ndarray:
+        """Rolling population average per metric, shape (days - window + 1, metrics)."""
+        return self._memo(("rolling_avg", window), lambda: rolling_mean(self.daily_means, window, axis=0))
+
+    @cached_stage
+    def correlation(self) -> np.ndarray:
+        """Correlation matrix between metrics over all user-days."""
+        return metric_correlation(self.cleaned_data, self.block_users)
+
+    @cached_stage
+    def goal_achievement_rate(self) -> np.ndarray:
+        """Percentage of days each user meets every goal."""
+        goals = [(self._dataset.metric_index(metric), minimum) for metric, minimum in self._goals.items()]
+        return goal_achievement(self.cleaned_data, goals, self.block_users)
+
+    def evaluate_goals(self, goals: tuple[Goal, ...], start_weekday: int = 0) -> GoalResults:
+        """Rates and streaks for many goal definitions at once (see GoalEngine)."""
+        goals = tuple(goals)
+        return self._memo(
+            ("goal_results", goals, start_weekday),
+            lambda: GoalEngine(goals, self._dataset.metric_names, self._dataset.metadata_columns).evaluate(
+                self.cleaned_data, self._dataset.user_metadata, start_weekday
+            ),
+        )
+
+    def segmentation(self, name: str) -> Segmentation:
+        """Users split by "activity" (mean steps), "age" band or "gender"."""
+        def compute():
+            metadata = self._dataset.user_metadata
+            columns = self._dataset.metadata_columns
+            if name == "activity":
+                return activity_levels(self.user_means[:, self._dataset.metric_index("steps")])
+            if name == "age":
+                return age_bands(metadata[:, columns.index("age")])
+            if name in columns:
+                return categories(name, metadata[:, columns.index(name)])
+            raise ValueError(f"unknown segmentation {name!r}")
+        return self._memo(("segmentation", name), compute)
+
+    def segments(self, *by: str) -> SegmentTable:
+        """Per-segment user count, metric mean/std and goal rate for the
+        cross product of the named segmentations, e.g. segments("activity", "age")."""
+        return self._memo(
+            ("segments", by),
+            lambda: cross_tab([self.segmentation(name) for name in by], self.user_means, self.goal_achievement_rate),
+        )
+
+    @property
+    def consistent_goal_users(self) -> np.ndarray:
+        """Users meeting all goals on more than CONSISTENT_GOAL_RATE % of days."""
+        return np.where(self.goal_achievement_rate > CONSISTENT_GOAL_RATE)[0]
+
+
+def main():
+    analyzer = ActivityAnalyzer(generate_activity_data())
+
+    print("=== Fitness Tracker Report ===\n")
+    print("Top 10 most active users:", analyzer.top_users(10) + 1)
+    print("Most consistent users:", analyzer.most_consistent_users(10) + 1)
+    print("Correlation matrix between metrics:\n", analyzer.correlation)
+    print("Number of users consistently meeting all goals (>80% days):", len(analyzer.consistent_goal_users))
+    print("Users per activity level:")
+    for (level,), count, means, _, goal_rate in analyzer.segments("activity").rows():
+        print(f"  {level}: {count} users, avg steps {means[0]:.0f}, goal rate {goal_rate:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+import numpy as np
+
+from .analyzer import generate_activity_data, metric_correlation
+from .cleaning import clean_batched
+from .data_transfom import distribute_grades, find_top_performers, generate_report
+from .describe import describe
+from .periods import aggregate_periods
+from .rolling import rolling_mean
+from .student_table import ATTENDANCE_DTYPE, SCORE_DTYPE, StudentTable
+
+DEFAULT_SCALES = (1_000, 10_000, 100_000)
+DEFAULT_REPEAT = 3
+# A case is flagged when it got this much slower than the baseline
+REGRESSION_THRESHOLD = 1.2
+NAMES = ("Liam", "Olivia", "Noah", "Emma", "Oliver", "Charlotte", "Elijah", "Amelia", "James", "Ava")
+
+
+def synthetic_roster(n_students: int, n_scores: int = 5, seed: int = 0) -> StudentTable:
+    """Random roster built directly as columns (no per-student Python objects)."""
+    rng = np.random.default_rng(seed)
+    width = len(str(max(n_students - 1, 0)))
+    ids = np.char.add("S", np.char.zfill(np.arange(n_students).astype(str), width))
+    names = np.array(NAMES)[rng.integers(0, len(NAMES), n_students)]
+    attendance = rng.integers(0, 31, n_students).astype(ATTENDANCE_DTYPE)
+    scores = rng.integers(40, 101, (n_students, n_scores)).astype(SCORE_DTYPE)
+    return StudentTable(ids, names, attendance, scores)
+
+
+def synthetic_temperatures(n_readings: int, n_days: int = 365, seed: int = 0) -> np.ndarray:
+    """(days, stations) readings with roughly n_readings values in total."""
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-10.0, 40.0, size=(n_days, max(1, n_readings // n_days)))
+
+
+@dataclass
+class BenchmarkCase:
+    """One timed operation. `setup` builds the input for a given size
+    (untimed); `run` is the measured call. `unit` names what size counts."""
+    name: str
+    unit: str
+    setup: Callable[[int, int], Any]
+    run: Callable[[Any], Any]
+
+
+def _roster(size: int, days: int) -> StudentTable:
+    return synthetic_roster(size)
+
+
+def _activity(size: int, days: int) -> np.ndarray:
+    return generate_activity_data(size, days).data
+
+
+def _cleaned_activity(size: int, days: int) -> np.ndarray:
+    return clean_batched(generate_activity_data(size, days).data)
+
+
+def _temperatures(size: int, days: int) -> np.ndarray:
+    return synthetic_temperatures(size)
+
+
+def _temperature_stats(data: np.ndarray):
+    describe(data, axis=0)
+    aggregate_periods(data, "2023-01-01", "month", stats=("mean", "min", "max", "std"))
+
+
+CASES = {
+    case.name: case
+    for case in (
+        BenchmarkCase("generate_report", "students", _roster, generate_report),
+        BenchmarkCase("find_top_performers", "students", _roster, lambda table: find_top_performers(table, 5)),
+        BenchmarkCase("distribute_grades", "students", _roster, distribute_grades),
+        BenchmarkCase("cleaning", "users", _activity, clean_batched),
+        BenchmarkCase("rolling", "users", _cleaned_activity, lambda data: rolling_mean(data, 7, axis=1)),
+        BenchmarkCase("correlation", "users", _cleaned_activity, metric_correlation),
+        BenchmarkCase("temperature_stats", "readings", _temperatures, _temperature_stats),
+    )
+}
+
+
+@dataclass
+class BenchmarkResult:
+    case: str
+    unit: str
+    size: int
+    repeat: int
+    best_seconds: float
+    mean_seconds: float
+    throughput: float
+    peak_bytes: int
+
+
+def run_case(case: BenchmarkCase, size: int, repeat: int = DEFAULT_REPEAT, days: int = 90) -> BenchmarkResult:
+    """Time `repeat` runs of a case (best and mean wall time), then measure
+    the peak traced allocation of one more run under tracemalloc, which
+    is kept separate because tracing slows allocation down."""
+    data = case.setup(size, days)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run(data)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        case.run(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(timings)
+    return BenchmarkResult(
+        case.name, case.unit, size, repeat, best, sum(timings) / repeat, size / best if best else float("inf"), peak
+    )
+
+
+def scaling_exponents(results: list[BenchmarkResult]) -> dict[str, float]:
+    """Slope of log(time) against log(size) per case: ~1 is linear,
+    ~2 quadratic. Only cases measured at two or more sizes are included."""
+    exponents = {}
+    for name in dict.fromkeys(result.case for result in results):
+        points = [(result.size, result.best_seconds) for result in results if result.case == name]
+        if len({size for size, _ in points}) > 1:
+            sizes, seconds = np.log(np.array(points, dtype=np.float64)).T
+            exponents[name] = float(np.polyfit(sizes, seconds, 1)[0])
+    return exponents
+
+
+def compare_results(
+    results: list[BenchmarkResult], baseline: dict, threshold: float = REGRESSION_THRESHOLD
+) -> list[tuple[str, int, float, bool]]:
+    """(case, size, time ratio to baseline, regressed) for every
+    measurement that also appears in a saved baseline run."""
+    previous = {(entry["case"], entry["size"]): entry["best_seconds"] for entry in baseline["results"]}
+    rows = []
+    for result in results:
+        before = previous.get((result.case, result.size))
+        if before:
+            ratio = result.best_seconds / before
+            rows.append((result.case, result.size, ratio, ratio > threshold))
+    return rows
+
+
+def to_json(results: list[BenchmarkResult]) -> dict:
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "results": [asdict(result) for result in results],
+        "scaling": scaling_exponents(results),
+    }
+
+
+def print_results(results: list[BenchmarkResult]):
+    print(f"{'case':<20} {'size':>10} {'best s':>10} {'mean s':>10} {'items/s':>12} {'peak MB':>9}")
+    for result in results:
+        print(
+            f"{result.case:<20} {result.size:>10} {result.best_seconds:>10.4f} {result.mean_seconds:>10.4f} "
+            f"{result.throughput:>12.0f} {result.peak_bytes / 2**20:>9.1f}"
+        )
+    exponents = scaling_exponents(results)
+    if exponents:
+        print("\nScaling exponent (time ~ size^k):")
+        for name, exponent in exponents.items():
+            print(f"{name}: {exponent:.2f}")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Time the report, analyzer and temperature paths at several sizes.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="students / users / readings per run, e.g. 1000 10000 ... 10000000")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--days", type=int, default=90, help="days per user for the analyzer cases")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.cases:
+        for size in args.scales:
+            results.append(run_case(CASES[name], size, args.repeat, args.days))
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(to_json(results), file, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        print("\nCompared to baseline:")
+        for case, size, ratio, regressed in compare_results(results, baseline, args.threshold):
+            print(f"{case:<20} {size:>10} {ratio:>6.2f}x{'  REGRESSION' if regressed else ''}")
+
+
+if __name__ == "__main__":
+    main()
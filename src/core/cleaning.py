@@ -0,0 +1,251 @@
+import warnings
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+
+from .dataset import DEFAULT_BLOCK_USERS, iter_user_blocks
+from .profiling import stage, timed
+
+IQR_FACTOR = 1.5
+DEFAULT_SKETCH_POINTS = 2048
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch made of weighted centroids.
+
+    Values are kept exactly until there are more than max_points of them;
+    after that neighbouring values are merged into equal-weight centroids,
+    which bounds the rank error to roughly 1/max_points per compression.
+    With exact points quantile() matches np.percentile's linear method."""
+
+    def __init__(self, max_points: int = DEFAULT_SKETCH_POINTS):
+        self.max_points = max_points
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> "QuantileSketch":
+        """Add a batch of (non-NaN) values."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self._absorb(values, np.ones(len(values)))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Combine two sketches into a new one."""
+        merged = QuantileSketch(self.max_points)
+        merged._absorb(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return merged
+
+    def _absorb(self, means: np.ndarray, weights: np.ndarray):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        if len(means) > self.max_points:
+            # Group points by the rank of their midpoint into max_points equal-weight buckets
+            cumulative = np.cumsum(weights)
+            groups = ((cumulative - weights / 2) / cumulative[-1] * self.max_points).astype(np.intp)
+            groups = np.minimum(groups, self.max_points - 1)
+            group_weights = np.bincount(groups, weights=weights, minlength=self.max_points)
+            group_sums = np.bincount(groups, weights=means * weights, minlength=self.max_points)
+            kept = group_weights > 0
+            means = group_sums[kept] / group_weights[kept]
+            weights = group_weights[kept]
+
+        self.means, self.weights = means, weights
+
+    def quantile(self, q):
+        """Estimate the q-th quantile(s), q in [0, 1]; NaN for an empty sketch."""
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        centers = np.cumsum(self.weights) - self.weights / 2 - 0.5
+        return np.interp(np.asarray(q) * (self.count - 1), centers, self.means)
+
+
+@dataclass
+class CleaningStats:
+    """Per-metric statistics gathered by the first cleaning pass."""
+    q1: np.ndarray
+    q3: np.ndarray
+    median: np.ndarray
+    mean: np.ndarray
+    missing: np.ndarray
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.q1 - IQR_FACTOR * (self.q3 - self.q1)
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.q3 + IQR_FACTOR * (self.q3 - self.q1)
+
+
+def _robust_stats(
+    data: np.ndarray, axis, block_users: int = DEFAULT_BLOCK_USERS
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """NaN-aware (low, high, median, mean) per metric along axis, keepdims.
+    The mean is taken after outliers are replaced by the median.
+    Quartiles of every metric come from one np.nanpercentile call (one per
+    block of users for per-user statistics); the outlier masks behind the
+    mean are built one block of users at a time so they stay block-sized."""
+    per_user = axis == 1
+    with warnings.catch_warnings():
+        # All-NaN series produce NaN statistics; callers fall back for those
+        warnings.simplefilter("ignore", RuntimeWarning)
+        if per_user:
+            quartiles = np.concatenate(
+                [np.nanpercentile(block, [25, 50, 75], axis=1, keepdims=True) for _, block in iter_user_blocks(data, block_users)],
+                axis=1,
+            )
+        else:
+            # Over a (cells, metrics) view numpy copies one metric column at a time
+            flat = data.reshape(-1, data.shape[-1])
+            quartiles = np.nanpercentile(flat, [25, 50, 75], axis=0).reshape(3, 1, 1, -1)
+    q1, median, q3 = quartiles
+    iqr = q3 - q1
+    low, high = q1 - IQR_FACTOR * iqr, q3 + IQR_FACTOR * iqr
+
+    inlier_sum = np.zeros(median.shape)
+    outlier_count = np.zeros(median.shape)
+    present_count = np.zeros(median.shape)
+    for start, block in iter_user_blocks(data, block_users):
+        rows = slice(start, start + len(block)) if per_user else slice(None)
+        present = ~np.isnan(block)
+        outliers = (block < low[rows]) | (block > high[rows])
+        inlier_sum[rows] += np.where(present & ~outliers, block, 0).sum(axis=axis, keepdims=True)
+        outlier_count[rows] += outliers.sum(axis=axis, keepdims=True)
+        present_count[rows] += present.sum(axis=axis, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (inlier_sum + outlier_count * median) / present_count
+    return low, high, median, mean
+
+
+def cleaning_fences(
+    data: np.ndarray, per_user: bool = False, block_users: int = DEFAULT_BLOCK_USERS
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(low, high, median, mean) used by clean_batched, shaped (1, 1, metrics)
+    or, with per_user=True, (users, 1, metrics). Users whose series is
+    entirely NaN get the population statistics."""
+    with stage("fences"):
+        low, high, median, mean = _robust_stats(data, (0, 1), block_users)
+        if per_user:
+            user_low, user_high, user_median, user_mean = _robust_stats(data, 1, block_users)
+            missing = np.isnan(user_median)
+            low = np.where(missing, low, user_low)
+            high = np.where(missing, high, user_high)
+            median = np.where(missing, median, user_median)
+            mean = np.where(missing, mean, user_mean)
+    return low, high, median, mean
+
+
+def _clean(data: np.ndarray, low, high, median, mean) -> np.ndarray:
+    with stage("impute"):
+        cleaned = np.where(np.isnan(data), mean, data)
+    with stage("outliers"):
+        # NaNs compare False, so imputed cells are never treated as outliers
+        np.copyto(cleaned, median, where=(data < low) | (data > high))
+    return cleaned
+
+
+def clean_batched(data: np.ndarray, per_user: bool = False, out: np.ndarray | None = None) -> np.ndarray:
+    """In-memory cleaning of a (users, days, metrics) tensor in one batched stage.
+
+    Quartiles and medians for every metric come from one np.nanpercentile
+    call (one per block of users for per-user statistics), so NaNs no longer disable the IQR filter. Values outside the
+    fences become the median, NaNs become the mean of the de-outliered data.
+    With per_user=True the statistics are taken per user and metric; series
+    that are entirely NaN fall back to the population statistics.
+    Returns a new array unless `out` (which may be data itself) is given."""
+    cleaned = _clean(data, *cleaning_fences(data, per_user))
+    if out is None:
+        return cleaned
+    out[...] = cleaned
+    return out
+
+
+def iter_cleaned_blocks(
+    data: np.ndarray, per_user: bool = False, block_users: int = DEFAULT_BLOCK_USERS, fences=None
+) -> Iterator[tuple[int, np.ndarray]]:
+    """Same result as clean_batched, yielded as (start, block) per block of
+    users so a consumer never holds the whole cleaned tensor. Pass the
+    cleaning_fences result to reuse it across several iterations."""
+    fences = cleaning_fences(data, per_user, block_users) if fences is None else fences
+    for start, block in iter_user_blocks(data, block_users):
+        stop = start + len(block)
+        yield start, _clean(block, *(fence[start:stop] if per_user else fence for fence in fences))
+
+
+@timed()
+def profile_metrics(
+    data: np.ndarray, block_users: int = DEFAULT_BLOCK_USERS, max_points: int = DEFAULT_SKETCH_POINTS
+) -> CleaningStats:
+    """First pass: quantile sketches and NaN counts per metric, reading the
+    tensor one block of users at a time. The fill mean is that of the
+    de-outliered data (as in _robust_stats): sketch weight inside the IQR
+    fences at its centroid value, weight outside the fences at the median."""
+    n_metrics = data.shape[2]
+    sketches = [QuantileSketch(max_points) for _ in range(n_metrics)]
+    missing = np.zeros(n_metrics, dtype=np.int64)
+
+    for _, block in iter_user_blocks(data, block_users):
+        values = block.reshape(-1, n_metrics)
+        present = ~np.isnan(values)
+        missing += (~present).sum(axis=0)
+        for m, sketch in enumerate(sketches):
+            sketch.update(values[present[:, m], m])
+
+    quartiles = np.array([sketch.quantile([0.25, 0.5, 0.75]) for sketch in sketches])
+    stats = CleaningStats(quartiles[:, 0], quartiles[:, 2], quartiles[:, 1], np.full(n_metrics, np.nan), missing)
+    for m, sketch in enumerate(sketches):
+        if sketch.count:
+            inside = (sketch.means >= stats.low[m]) & (sketch.means <= stats.high[m])
+            total = (sketch.means * sketch.weights)[inside].sum() + sketch.weights[~inside].sum() * stats.median[m]
+            stats.mean[m] = total / sketch.count
+    return stats
+
+
+@timed()
+def apply_cleaning(
+    data: np.ndarray,
+    stats: CleaningStats,
+    out: np.ndarray | None = None,
+    block_users: int = DEFAULT_BLOCK_USERS,
+    fill: str = "mean",
+) -> np.ndarray:
+    """Second pass: replace values outside the IQR fences with the metric
+    median and NaNs with the metric mean (or median with fill="median").
+    Writes into `out` block by block; without it data is cleaned in place."""
+    if fill not in ("mean", "median"):
+        raise ValueError("fill must be 'mean' or 'median'")
+    out = data if out is None else out
+    if out.shape != data.shape:
+        raise ValueError("out must have the same shape as data")
+    fill_values = stats.mean if fill == "mean" else stats.median
+    low, high = stats.low, stats.high
+
+    for start, block in iter_user_blocks(data, block_users):
+        cleaned = np.where((block < low) | (block > high), stats.median, block)
+        cleaned = np.where(np.isnan(cleaned), fill_values, cleaned)
+        out[start:start + len(block)] = cleaned
+
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+
+def clean_out_of_core(
+    data: np.ndarray,
+    out: np.ndarray | None = None,
+    block_users: int = DEFAULT_BLOCK_USERS,
+    fill: str = "mean",
+    max_points: int = DEFAULT_SKETCH_POINTS,
+) -> tuple[np.ndarray, CleaningStats]:
+    """Outlier removal and imputation in two sequential reads of the tensor,
+    holding only one block of users plus the per-metric sketches in memory."""
+    stats = profile_metrics(data, block_users, max_points)
+    return apply_cleaning(data, stats, out, block_users, fill), stats
@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+import numpy as np
+
+from .dataset import DEFAULT_BLOCK_USERS, iter_user_blocks
+
+STORAGE_DTYPES = {"float32": np.float32, "int16": np.int16, "uint16": np.uint16}
+
+
+class CompactTensor:
+    """Metric array (channels on the last axis) stored as float32 or as
+    per-channel scaled int16/uint16 codes plus a packed validity bitmask.
+
+    Slicing along the first axis decodes that block to float64 with NaN for
+    missing values, so the block-wise analytics (which iterate with
+    iter_user_blocks) run on it unchanged and accumulate in float64.
+
+    Precision: float32 keeps a relative error below 2**-24 (~6e-8).
+    Integer codes use a power-of-two step and an integer offset per
+    channel, so integer readings (steps, minutes, heart rate) decode
+    exactly whenever the channel range fits in the 65536 codes (step <= 1);
+    other values are off by at most step / 2 (see max_abs_error).
+    Encoding refuses an all-integer channel whose range needs a step > 1."""
+
+    def __init__(self, codes: np.ndarray, offset: np.ndarray, step: np.ndarray, valid_bits: np.ndarray | None):
+        self.codes = codes
+        self.offset = offset
+        self.step = step
+        self.valid_bits = valid_bits
+        self.shape = codes.shape
+        self.dtype = np.dtype(np.float64)
+        self.ndim = codes.ndim
+
+    @classmethod
+    def encode(cls, data: np.ndarray, storage: str = "float32", block_users: int = DEFAULT_BLOCK_USERS) -> "CompactTensor":
+        """Compress an array; NaNs are kept (float32) or masked out (integers)."""
+        return cls.from_blocks(lambda users: iter_user_blocks(data, users), data.shape, storage, block_users)
+
+    @classmethod
+    def from_blocks(
+        cls,
+        blocks: Callable[[int], Iterator[tuple[int, np.ndarray]]],
+        shape: tuple[int, ...],
+        storage: str = "float32",
+        block_users: int = DEFAULT_BLOCK_USERS,
+    ) -> "CompactTensor":
+        """Encode from a block source without holding the float64 array:
+        blocks(block_users) yields (start, block) along the first axis and
+        is called twice for integer storage (range pass, then encoding)."""
+        if storage not in STORAGE_DTYPES:
+            raise ValueError(f"storage must be one of {sorted(STORAGE_DTYPES)}")
+        dtype = STORAGE_DTYPES[storage]
+        channels = shape[-1]
+        codes = np.empty(shape, dtype=dtype)
+
+        if storage == "float32":
+            for start, block in blocks(block_users):
+                codes[start:start + len(block)] = block
+            return cls(codes, np.zeros(channels), np.ones(channels), None)
+
+        # Multiples of 8 users keep every block's validity bits byte-aligned
+        block_users = -(-block_users // 8) * 8
+        low = np.full(channels, np.inf)
+        high = np.full(channels, -np.inf)
+        integral = np.ones(channels, dtype=bool)
+        for _, block in blocks(block_users):
+            flat = block.reshape(-1, channels)
+            low = np.fmin(low, np.nanmin(flat, axis=0, initial=np.inf))
+            high = np.fmax(high, np.nanmax(flat, axis=0, initial=-np.inf))
+            integral &= np.all(np.isnan(flat) | (flat == np.rint(flat)), axis=0)
+        low = np.floor(np.where(np.isfinite(low), low, 0))
+        high = np.where(np.isfinite(high), high, low)
+
+        info = np.iinfo(dtype)
+        span = int(info.max) - int(info.min)
+        step = 2.0 ** np.ceil(np.log2(np.maximum(high - low, 1) / span))
+        if np.any(integral & (step > 1)):
+            wide = np.flatnonzero(integral & (step > 1)).tolist()
+            raise ValueError(f"integer channels {wide} span more than {span + 1} values; use float32 storage")
+        offset = low - step * int(info.min)
+
+        per_row = int(np.prod(shape[1:]))
+        valid_bits = np.empty(-(-int(np.prod(shape)) // 8), dtype=np.uint8)
+        for start, block in blocks(block_users):
+            present = ~np.isnan(block)
+            scaled = np.rint((np.where(present, block, offset) - offset) / step)
+            codes[start:start + len(block)] = np.clip(scaled, info.min, info.max)
+            bit_start = start * per_row
+            if bit_start % 8:
+                raise ValueError("blocks must start on a multiple of 8 rows")
+            packed = np.packbits(present.ravel())
+            valid_bits[bit_start // 8:bit_start // 8 + len(packed)] = packed
+        return cls(codes, offset, step, valid_bits)
+
+    @property
+    def storage(self) -> str:
+        return self.codes.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (0 if self.valid_bits is None else self.valid_bits.nbytes)
+
+    @property
+    def max_abs_error(self) -> np.ndarray:
+        """Worst-case absolute rounding error per channel for integer storage
+        (for float32 the bound is relative, see the class docstring)."""
+        if self.valid_bits is None:
+            return np.full(self.shape[-1], np.nan)
+        return self.step / 2
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, rows: slice) -> np.ndarray:
+        if not isinstance(rows, slice):
+            raise TypeError("CompactTensor only supports slicing along the first axis")
+        start, stop, stride = rows.indices(self.shape[0])
+        if stride != 1:
+            raise ValueError("CompactTensor slices must be contiguous")
+        stop = max(start, stop)
+        codes = self.codes[start:stop]
+        if self.valid_bits is None:
+            return codes.astype(np.float64)
+
+        values = codes * self.step + self.offset
+        per_row = int(np.prod(self.shape[1:]))
+        bit_start, bit_stop = start * per_row, stop * per_row
+        byte_start = bit_start // 8
+        bits = np.unpackbits(self.valid_bits[byte_start:-(-bit_stop // 8)])
+        valid = bits[bit_start - byte_start * 8:bit_stop - byte_start * 8].astype(bool).reshape(values.shape)
+        return np.where(valid, values, np.nan)
+
+    def decode(self) -> np.ndarray:
+        """The whole array as float64."""
+        return self[:]
+
+
+@dataclass
+class ToleranceReport:
+    """Differences between the compact and the float64 path."""
+    max_abs_error: np.ndarray
+    max_rel_error: np.ndarray
+    mean_abs_error: np.ndarray
+    nan_mismatches: int
+    scale: np.ndarray
+
+    def within(self, rtol: float = 1e-6, atol: float | np.ndarray = 0.0) -> bool:
+        """True when NaNs line up and every channel's worst error is below
+        atol + rtol * (largest magnitude in that channel)."""
+        return self.nan_mismatches == 0 and bool(np.all(self.max_abs_error <= atol + rtol * self.scale))
+
+
+def compare_to_float64(data: np.ndarray, compact: CompactTensor, block_users: int = DEFAULT_BLOCK_USERS) -> ToleranceReport:
+    """Block-wise element error of a CompactTensor against its float64 source,
+    per channel. Use ToleranceReport.within() as the acceptance check, e.g.
+    rtol=1e-6 for float32 or atol=compact.max_abs_error for integer storage."""
+    channels = data.shape[-1]
+    max_abs = np.zeros(channels)
+    max_rel = np.zeros(channels)
+    total_abs = np.zeros(channels)
+    scale = np.zeros(channels)
+    count = np.zeros(channels)
+    nan_mismatches = 0
+
+    for start, block in iter_user_blocks(data, block_users):
+        decoded = compact[start:start + len(block)]
+        nan_mismatches += int((np.isnan(block) != np.isnan(decoded)).sum())
+        present = ~np.isnan(block)
+        error = np.where(present, np.abs(decoded - block), 0).reshape(-1, channels)
+        magnitude = np.where(present, np.abs(block), 0).reshape(-1, channels)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            relative = np.where(magnitude > 0, error / magnitude, 0)
+        max_abs = np.maximum(max_abs, error.max(axis=0, initial=0))
+        max_rel = np.maximum(max_rel, relative.max(axis=0, initial=0))
+        scale = np.maximum(scale, magnitude.max(axis=0, initial=0))
+        total_abs += error.sum(axis=0)
+        count += present.reshape(-1, channels).sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_abs = total_abs / count
+    return ToleranceReport(max_abs, max_rel, mean_abs, nan_mismatches, scale)
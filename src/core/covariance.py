@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class CovarianceAccumulator:
+    """Online covariance / correlation over row blocks of an (n, features) stream.
+
+    Keeps only the row count, the feature means and the co-moment matrix,
+    so memory is O(features^2) whatever the number of rows. Blocks are
+    combined with Chan et al.'s pairwise update (the block form of Welford's
+    algorithm), which is also how merge() joins accumulators from parallel
+    workers. With skip_nan_rows, rows containing a NaN are ignored;
+    otherwise NaNs propagate like in np.corrcoef."""
+
+    def __init__(self, n_features: int, skip_nan_rows: bool = False):
+        self.n_features = n_features
+        self.skip_nan_rows = skip_nan_rows
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.comoment = np.zeros((n_features, n_features))
+
+    def update(self, rows: np.ndarray) -> "CovarianceAccumulator":
+        """Fold a (rows, features) block into the running statistics."""
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.ndim != 2 or rows.shape[1] != self.n_features:
+            raise ValueError(f"rows must have shape (n, {self.n_features})")
+        if self.skip_nan_rows:
+            rows = rows[~np.isnan(rows).any(axis=1)]
+        if len(rows) == 0:
+            return self
+
+        block_mean = rows.mean(axis=0)
+        centred = rows - block_mean
+        self._combine(len(rows), block_mean, centred.T @ centred)
+        return self
+
+    def merge(self, other: "CovarianceAccumulator") -> "CovarianceAccumulator":
+        """Combine two accumulators into a new one."""
+        if other.n_features != self.n_features:
+            raise ValueError("can only merge accumulators with the same number of features")
+        merged = CovarianceAccumulator(self.n_features, self.skip_nan_rows)
+        merged.count, merged.mean, merged.comoment = self.count, self.mean.copy(), self.comoment.copy()
+        if other.count:
+            merged._combine(other.count, other.mean, other.comoment)
+        return merged
+
+    __add__ = merge
+
+    def _combine(self, count: int, mean: np.ndarray, comoment: np.ndarray):
+        total = self.count + count
+        delta = mean - self.mean
+        self.comoment = self.comoment + comoment + np.outer(delta, delta) * (self.count * count / total)
+        self.mean = self.mean + delta * (count / total)
+        self.count = total
+
+    def covariance(self, ddof: int = 1) -> np.ndarray:
+        """Covariance matrix (ddof=1 matches np.cov)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.comoment / (self.count - ddof)
+
+    def correlation(self) -> np.ndarray:
+        """Pearson correlation matrix (matches np.corrcoef on the same rows)."""
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            correlation = self.comoment / np.outer(std, std)
+        return np.clip(correlation, -1, 1)
@@ -1,99 +1,132 @@
-from ..constants import SCORE_GRADES
-from ..types import student_dict_T, SubjectStatus,  Report, FailingCase
+from typing import Sequence
+
+import numpy as np
+
+from ..constants import PASSING_AVERAGE, PASSING_ATTENDANCE, MAX_ATTENDANCE
+from ..types import student_dict_T, SubjectStatus,  Report
+from .grading import GradingScale, DEFAULT_SCALE
+from .profiling import stage, timed
+from .policy import Eligibility, FailedStudents, failure_codes, format_reason
+from .report_engine import build_report, build_report_parallel
+from .selection import top_k, top_k_indices
+from .student_table import StudentTable
 from data import students
 
 
-def calculate_average(scores: list[int]) -> float:
+def calculate_average(scores: list[int] | np.ndarray) -> float:
     """Calculate the arithmetic mean of a list of scores."""
+    if isinstance(scores, np.ndarray):
+        # ndarray.sum widens uint8 scores, builtin sum would overflow
+        return float(scores.sum()) / len(scores)
     return sum(scores) / len(scores)
 
 
-def assign_grade(average: float) -> str:
-    """Convert a numerical average to letter grade based on SCORE_GRADES scale."""
-    for grade, range in SCORE_GRADES.items():
-        if average >= range[0] and average <= range[1]:
-            return grade
+def assign_grade(average: float, scale: GradingScale = DEFAULT_SCALE) -> str:
+    """Convert a numerical average to letter grade based on the grading scale (SCORE_GRADES by default)."""
+    return scale.grade(average)
 
 
-def check_eligibility(student: dict) -> tuple[bool, str]:
+def check_eligibility(
+    student: dict,
+    passing_average: float = PASSING_AVERAGE,
+    passing_attendance: float = PASSING_ATTENDANCE,
+    max_attandance: int = MAX_ATTENDANCE,
+) -> tuple[bool, str]:
     """Check if a student passes based on scores and attendance.
     Returns (passed, reason) tuple where reason explains any failure."""
     student_average = calculate_average(student["scores"])
-    student_attendance = calculate_attandance_percantage(student["attendance"])
-    status = True if student_average >= 60 and student_attendance >= 75 else False
-    if not status:
-        if student_average < 60 and student_attendance >= 75:
-           return (status, f'{FailingCase.LOW_AVERAGE.value} ({round_two_decimals(student_average)}%)')
-        elif student_average >= 60 and student_attendance < 75:
-            return (status, f'{FailingCase.LOW_ATTENDANCE.value} ({round_two_decimals(student_attendance)}%)')
-        else:
-            return (status, f'{FailingCase.LOW_AVERAGE.value}({round_two_decimals(student_average)}) , {FailingCase.LOW_ATTENDANCE.value} ({round_two_decimals(student_attendance)}%)')
+    student_attendance = calculate_attandance_percantage(student["attendance"], max_attandance)
+    code = int(failure_codes(student_average, student_attendance, passing_average, passing_attendance))
+    if code:
+        return (False, format_reason(code, student_average, student_attendance))
 
-    return (status, SubjectStatus.PASS.value)
+    return (True, SubjectStatus.PASS.value)
 
 
+@timed()
 def find_top_performers(
-    students: dict[student_dict_T], n: int
+    students: dict[student_dict_T] | StudentTable, n: int
 ) -> list[tuple[str, float]]:
     """Find the top n performers based on average scores.
-    Returns list of (name, average) tuples."""
-    performance_data = []
-
-    for student_id, student_data in students.items():
-        avg = calculate_average(student_data["scores"])
-        performance_data.append((student_data["name"], avg))
-
-    performance_data.sort(key=lambda x: x[1])
-    return performance_data[-n:]
-
-
-def generate_report(students: dict[student_dict_T]) -> Report:
-    """Generate a comprehensive report with class statistics and student performance metrics."""
-    total_students = len(students)
-    passed_count = sum(
-        1 for eligibility in calculate_total_eligibility(students) if eligibility[0]
+    Returns list of (name, average) tuples, best first."""
+    if isinstance(students, StudentTable):
+        averages = students.averages()
+        return [(students.names.item(row), float(averages[row])) for row in top_k_indices(averages, n)]
+
+    performance_data = (
+        (student_data["name"], calculate_average(student_data["scores"]))
+        for student_data in students.values()
     )
-    passed_rate = passed_count / total_students * 100
+    return top_k(performance_data, n, key=lambda x: x[1])
+
+
+@timed()
+def generate_report(
+    students: dict[student_dict_T] | StudentTable, scale: GradingScale = DEFAULT_SCALE, workers: int = 1
+) -> Report:
+    """Generate a comprehensive report with class statistics and student performance metrics.
+    The roster is loaded once into columns and every statistic is computed in a single vectorized pass.
+    With workers > 1 the roster is sharded across that many processes.
+    Rosters that do not fit a StudentTable (fractional or out-of-range values,
+    students with different numbers of scores) take the per-student path."""
+    with stage("load_table"):
+        try:
+            table = students if isinstance(students, StudentTable) else StudentTable.from_dict(students)
+        except ValueError:
+            return _generate_report_per_student(students, scale)
+    if workers > 1:
+        return build_report_parallel(table, workers, scale=scale)
+    return build_report(table, scale=scale)
+
+
+def _generate_report_per_student(students: dict[student_dict_T], scale: GradingScale = DEFAULT_SCALE) -> Report:
+    """The report built with the per-student functions, for irregular rosters."""
+    total_students = len(students)
+    passed_count = sum(1 for passed, _ in calculate_total_eligibility(students) if passed)
     failed_count = total_students - passed_count
-    failed_rate = failed_count / total_students * 100
-    class_average = calculate_total_average(students)
     highest_score, lowest_score = find_minmax(students)
-    attendance_ratios = calculate_attendance_ratio(students)
-    average_attendance_rate = sum(attendance_ratios) / total_students
-    report = Report(
+    return Report(
         students,
         total_students,
         passed_count,
-        passed_rate,
+        passed_count / total_students * 100,
         failed_count,
-        failed_rate,
-        class_average,
+        failed_count / total_students * 100,
+        calculate_total_average(students),
         highest_score,
         lowest_score,
-        average_attendance_rate,
+        sum(calculate_attendance_ratio(students)) / total_students,
+        top_performers=find_top_performers(students, 5),
+        grade_distribution=distribute_grades(students, scale),
+        failed_students=filter_failed_students(students),
+        scale=scale,
     )
 
-    return report
-
 
-def calculate_attandance_percantage(attandance: int, max_attandance=30) -> float:
+def calculate_attandance_percantage(attandance: int, max_attandance: int = MAX_ATTENDANCE) -> float:
     """Calculate attendance percentage based on attended days and maximum possible days."""
     return attandance / max_attandance * 100
 
 
 def calculate_total_eligibility(
-    students: dict[student_dict_T],
-) -> list[tuple[bool, str]]:
+    students: dict[student_dict_T] | StudentTable,
+) -> Sequence[tuple[bool, str]]:
     """Check eligibility status for all students.
-    Returns list of (passed, reason) tuples."""
+    Returns list of (passed, reason) tuples; for a StudentTable a sequence
+    that formats each reason when it is read."""
+    if isinstance(students, StudentTable):
+        return Eligibility.of(students)
     total_eligibility = []
     for student_id, student_data in students.items():
         total_eligibility.append(check_eligibility(student_data))
     return total_eligibility
 
 
-def calculate_total_average(students: dict[student_dict_T]) -> float:
+def calculate_total_average(students: dict[student_dict_T] | StudentTable) -> float:
     """Calculate the average score across all students in the class."""
+    if isinstance(students, StudentTable):
+        return float(students.averages().mean())
+
     averages = []
 
     for student_id, student_data in students.items():
@@ -101,9 +134,12 @@ def calculate_total_average(students: dict[student_dict_T]) -> float:
     return sum(averages) / len(averages)
 
 
-def find_minmax(students: dict[student_dict_T]) -> tuple[int, int]:
+def find_minmax(students: dict[student_dict_T] | StudentTable) -> tuple[int, int]:
     """Find highest and lowest scores across all students.
     Returns (max_score, min_score) tuple."""
+    if isinstance(students, StudentTable):
+        return (int(students.scores.max()), int(students.scores.min()))
+
     flattened_scores = []
     min_n = 100
     max_n = 0
@@ -120,9 +156,12 @@ def find_minmax(students: dict[student_dict_T]) -> tuple[int, int]:
     return (max_n, min_n)
 
 
-def calculate_attendance_ratio(students: dict[student_dict_T]) -> list[float]:
+def calculate_attendance_ratio(students: dict[student_dict_T] | StudentTable) -> list[float]:
     """Calculate attendance ratios for all students.
     Returns list of attendance percentages."""
+    if isinstance(students, StudentTable):
+        return students.attendance_rates(MAX_ATTENDANCE).tolist()
+
     total_attendance_ratio = []
 
     for student_id, student_data in students.items():
@@ -138,24 +177,32 @@ def round_two_decimals(x: float) -> float:
     return round(x, 2)
 
 
+@timed()
 def distribute_grades(
-    students: dict[student_dict_T],
+    students: dict[student_dict_T] | StudentTable, scale: GradingScale = DEFAULT_SCALE
 ) -> dict[str, int]:
     """Count number of students achieving each letter grade.
     Returns dict mapping grades to counts."""
-    distributed_grades = dict.fromkeys(SCORE_GRADES.keys(), 0)
-
-    for student_id, student_data in students.items():
-        s_grade = assign_grade(calculate_average(student_data["scores"]))
-        if s_grade is not None:
-            distributed_grades[s_grade] += 1
-
-    return distributed_grades
+    if isinstance(students, StudentTable):
+        return scale.histogram(students.averages())
+    averages = np.fromiter(
+        (calculate_average(student_data["scores"]) for student_data in students.values()),
+        dtype=np.float64,
+        count=len(students),
+    )
+    return scale.histogram(averages)
 
 
-def filter_failed_students(students: dict[student_dict_T]) -> list[dict[str, tuple[bool,str]]]:
+@timed()
+def filter_failed_students(students: dict[student_dict_T] | StudentTable) -> Sequence[dict[str, str]]:
     """Get list of students who failed with their failure reasons.
-    Returns list of dicts with id, name, and failure reason."""
+    Returns list of dicts with id, name, and failure reason; for a
+    StudentTable a FailedStudents sequence that formats them on access."""
+    if isinstance(students, StudentTable):
+        averages = students.averages()
+        attendance_rates = students.attendance_rates(MAX_ATTENDANCE)
+        return FailedStudents.select(students, failure_codes(averages, attendance_rates), averages, attendance_rates)
+
     failed_students = []
 
     for student_id, student_data in students.items():
@@ -166,13 +213,22 @@ def filter_failed_students(students: dict[student_dict_T]) -> list[dict[str, tup
     return failed_students
 
 
+@timed()
 def print_report(report: Report):
     """Print formatted report showing class statistics, top performers, failures, and grade distribution."""
     PERFORMER_QUANTITY = 5
     students_data = report.students_data[0] if isinstance(report.students_data, tuple) else report.students_data
-    top_5_performer_data = find_top_performers(students_data, PERFORMER_QUANTITY)
-    grade_distribution_data = distribute_grades(students_data)
-    failed_students_data = filter_failed_students(students_data)
+    top_5_performer_data = report.top_performers
+    grade_distribution_data = report.grade_distribution
+    failed_students_data = report.failed_students
+    scale = report.scale if report.scale is not None else DEFAULT_SCALE
+    # Reports built without precomputed sections fall back to walking the students
+    if top_5_performer_data is None:
+        top_5_performer_data = find_top_performers(students_data, PERFORMER_QUANTITY)
+    if grade_distribution_data is None:
+        grade_distribution_data = distribute_grades(students_data, scale)
+    if failed_students_data is None:
+        failed_students_data = filter_failed_students(students_data)
     
     print("=== COURSE STATISTICS ===")
 
@@ -185,7 +241,7 @@ def print_report(report: Report):
     print("\n")
     print("=== TOP 5 PERFORMERS ===")
     for index, (student, score) in enumerate(top_5_performer_data, 1):
-        print(f"{index}. {student} - {score} ({assign_grade(score)})")
+        print(f"{index}. {student} - {score} ({assign_grade(score, scale)})")
 
     print("\n")
 
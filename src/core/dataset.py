@@ -0,0 +1,169 @@
+import json
+import struct
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+# File layout:
+#   MAGIC | uint32 header length | JSON header | padding
+#   user metadata block (users, columns) | padding
+#   data block (users, days, metrics), C order
+# Both blocks start on ALIGNMENT-byte boundaries so they can be memory-mapped.
+MAGIC = b"FITDATA1"
+ALIGNMENT = 64
+METRIC_NAMES = ("steps", "calories", "active_minutes", "avg_heart_rate")
+METADATA_COLUMNS = ("user_id", "age", "gender")
+DEFAULT_BLOCK_USERS = 4096
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class ActivityDataset:
+    """A (users, days, metrics) activity tensor plus per-user metadata,
+    either in memory or memory-mapped from a dataset file."""
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        user_metadata: np.ndarray,
+        metric_names: tuple[str, ...] = METRIC_NAMES,
+        metadata_columns: tuple[str, ...] = METADATA_COLUMNS,
+        path: Path | None = None,
+    ):
+        if data.ndim != 3:
+            raise ValueError("data must have shape (users, days, metrics)")
+        if data.shape[2] != len(metric_names):
+            raise ValueError("one metric name is needed per metric")
+        if user_metadata.shape != (data.shape[0], len(metadata_columns)):
+            raise ValueError("user_metadata must have one row per user and one column per metadata column")
+        self.data = data
+        self.user_metadata = user_metadata
+        self.metric_names = tuple(metric_names)
+        self.metadata_columns = tuple(metadata_columns)
+        self.path = path
+
+    @property
+    def n_users(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def n_days(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def n_metrics(self) -> int:
+        return self.data.shape[2]
+
+    def metric_index(self, name: str) -> int:
+        return self.metric_names.index(name)
+
+    def iter_blocks(self, block_users: int = DEFAULT_BLOCK_USERS) -> Iterator[tuple[int, np.ndarray]]:
+        """Yield (first_user, block) views of at most block_users users."""
+        yield from iter_user_blocks(self.data, block_users)
+
+    def flush(self):
+        """Write pending changes of a writable mapping to disk."""
+        if isinstance(self.data, np.memmap):
+            self.data.flush()
+        if isinstance(self.user_metadata, np.memmap):
+            self.user_metadata.flush()
+
+
+def iter_user_blocks(data: np.ndarray, block_users: int = DEFAULT_BLOCK_USERS) -> Iterator[tuple[int, np.ndarray]]:
+    """Yield (first_user, block) views over the user axis of a tensor.
+    On a memmap only the current block is paged in."""
+    if block_users <= 0:
+        raise ValueError("block_users must be positive")
+    for start in range(0, data.shape[0], block_users):
+        yield start, data[start:start + block_users]
+
+
+def _header(shape, dtype, metric_names, metadata_shape, metadata_dtype, metadata_columns) -> tuple[bytes, dict]:
+    header = {
+        "shape": list(shape),
+        "dtype": np.dtype(dtype).str,
+        "metric_names": list(metric_names),
+        "metadata_shape": list(metadata_shape),
+        "metadata_dtype": np.dtype(metadata_dtype).str,
+        "metadata_columns": list(metadata_columns),
+    }
+    # Offsets depend on the encoded header length, so encode with placeholders first
+    header["metadata_offset"] = header["data_offset"] = 0
+    size = len(MAGIC) + 4 + len(json.dumps(header).encode()) + 64
+    header["metadata_offset"] = _align(size)
+    metadata_nbytes = int(np.prod(metadata_shape)) * np.dtype(metadata_dtype).itemsize
+    header["data_offset"] = _align(header["metadata_offset"] + metadata_nbytes)
+    encoded = json.dumps(header).encode()
+    if len(MAGIC) + 4 + len(encoded) > header["metadata_offset"]:
+        raise ValueError("dataset header too large")
+    return MAGIC + struct.pack("<I", len(encoded)) + encoded, header
+
+
+def create_dataset(
+    path: str | Path,
+    shape: tuple[int, int, int],
+    user_metadata: np.ndarray,
+    metric_names: tuple[str, ...] = METRIC_NAMES,
+    metadata_columns: tuple[str, ...] = METADATA_COLUMNS,
+    dtype=np.float64,
+) -> ActivityDataset:
+    """Create a dataset file and return it mapped read-write.
+    The data block starts zero-filled; fill it block by block and flush()."""
+    path = Path(path)
+    user_metadata = np.asarray(user_metadata)
+    prefix, header = _header(shape, dtype, metric_names, user_metadata.shape, user_metadata.dtype, metadata_columns)
+    data_nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+    with open(path, "wb") as file:
+        file.write(prefix)
+        file.seek(header["metadata_offset"])
+        file.write(np.ascontiguousarray(user_metadata).tobytes())
+        file.truncate(header["data_offset"] + data_nbytes)
+
+    return open_dataset(path, mode="r+")
+
+
+def write_dataset(path: str | Path, dataset: ActivityDataset, block_users: int = DEFAULT_BLOCK_USERS) -> ActivityDataset:
+    """Write an in-memory (or mapped) dataset to a file, copying block by block.
+    Returns the new file opened read-only."""
+    target = create_dataset(
+        path, dataset.data.shape, dataset.user_metadata, dataset.metric_names, dataset.metadata_columns, dataset.data.dtype
+    )
+    for start, block in dataset.iter_blocks(block_users):
+        target.data[start:start + len(block)] = block
+    target.flush()
+    return open_dataset(path)
+
+
+def read_header(path: str | Path) -> dict:
+    """Read and validate the JSON header of a dataset file."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an activity dataset file")
+        (length,) = struct.unpack("<I", file.read(4))
+        return json.loads(file.read(length))
+
+
+def open_dataset(path: str | Path, mode: str = "r") -> ActivityDataset:
+    """Memory-map a dataset file. mode follows np.memmap: "r" read-only,
+    "r+" read-write, "c" copy-on-write (changes stay in memory)."""
+    path = Path(path)
+    header = read_header(path)
+    user_metadata = np.memmap(
+        path,
+        dtype=np.dtype(header["metadata_dtype"]),
+        mode=mode,
+        offset=header["metadata_offset"],
+        shape=tuple(header["metadata_shape"]),
+    )
+    data = np.memmap(
+        path,
+        dtype=np.dtype(header["dtype"]),
+        mode=mode,
+        offset=header["data_offset"],
+        shape=tuple(header["shape"]),
+    )
+    return ActivityDataset(data, user_metadata, tuple(header["metric_names"]), tuple(header["metadata_columns"]), path)
@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+DEFAULT_PERCENTILES = (25, 50, 75)
+
+
+@dataclass
+class Description:
+    """Summary statistics along one axis; every array has that axis removed.
+    percentiles is stacked along a new first axis in the order of q."""
+    count: int
+    mean: np.ndarray
+    std: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    median: np.ndarray
+    argmin: np.ndarray
+    argmax: np.ndarray
+    q: tuple[float, ...]
+    percentiles: np.ndarray
+
+    def percentile(self, q: float) -> np.ndarray:
+        if q not in self.q:
+            raise KeyError(f"percentile {q} was not requested")
+        return self.percentiles[self.q.index(q)]
+
+
+def describe(
+    array: np.ndarray, axis: int | None = 0, percentiles: Sequence[float] = DEFAULT_PERCENTILES, ddof: int = 0
+) -> Description:
+    """Count, mean, std, min, max, argmin, argmax and percentiles in one call.
+
+    A single np.argpartition on every order statistic needed (0, the
+    middle rank(s), n-1 and both neighbours of each interpolated percentile,
+    as in np.percentile's linear method) yields min, max, their positions,
+    the median and all percentiles at once. Mean and std come from one
+    pass of sums shifted by the middle value, which keeps the one-pass
+    variance numerically stable. axis=None describes the flattened array.
+    NaN is not supported; when extremes tie, argmin/argmax may point at
+    any of the tied positions."""
+    values = np.asarray(array, dtype=np.float64)
+    if axis is None:
+        values, axis = values.reshape(-1), 0
+    values = np.moveaxis(values, axis, 0)
+    n = len(values)
+    if not n:
+        raise ValueError("cannot describe an empty axis")
+
+    q = tuple(percentiles)
+    position = np.asarray(q, dtype=np.float64) / 100 * (n - 1)
+    low = np.floor(position).astype(np.intp)
+    high = np.minimum(low + 1, n - 1)
+    kth = np.unique(np.concatenate(([0, (n - 1) // 2, n // 2, n - 1], low, high)))
+
+    order = np.argpartition(values, kth, axis=0)
+    ranked = np.take_along_axis(values, order[kth], axis=0)
+    at = {k: i for i, k in enumerate(kth)}
+    pick = lambda ks: ranked[[at[k] for k in ks]]
+
+    fraction = (position - low).reshape((-1,) + (1,) * (values.ndim - 1))
+    lows, highs = pick(low), pick(high)
+    stacked = lows + (highs - lows) * fraction
+
+    # Shift by a central order statistic before summing
+    shift = pick([n // 2])
+    shifted = values - shift
+    total = shifted.sum(axis=0)
+    squares = np.einsum("i...,i...->...", shifted, shifted)
+    mean = total / n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = np.maximum(squares - total * mean, 0) / (n - ddof)
+
+    return Description(
+        count=n,
+        mean=mean + shift[0],
+        std=np.sqrt(variance),
+        min=ranked[at[0]],
+        max=ranked[at[n - 1]],
+        median=(pick([(n - 1) // 2])[0] + pick([n // 2])[0]) / 2,
+        argmin=order[0],
+        argmax=order[n - 1],
+        q=q,
+        percentiles=stacked,
+    )
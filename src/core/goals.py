@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from .dataset import METADATA_COLUMNS, iter_user_blocks
+
+# comparator -> (sign, strict); "<=" and "<" are evaluated as -value >= -target
+COMPARATORS = {">=": (1, False), ">": (1, True), "<=": (-1, False), "<": (-1, True)}
+DAYS_PER_WEEK = 7
+# Upper bound on goals x users x days elements evaluated per block
+MAX_BLOCK_ELEMENTS = 1 << 24
+
+
+@dataclass(frozen=True)
+class Goal:
+    """A daily target on one metric.
+
+    age_targets replaces `target` for users at or above each minimum age,
+    given as ((min_age, target), ...). weekday_scale multiplies the target
+    per weekday, Monday first, e.g. lower step goals at weekends."""
+    name: str
+    metric: str
+    target: float
+    comparator: str = ">="
+    age_targets: tuple[tuple[float, float], ...] = ()
+    weekday_scale: tuple[float, ...] | None = None
+
+    def __post_init__(self):
+        # Lists are accepted but stored as tuples so goals stay hashable
+        object.__setattr__(self, "age_targets", tuple(tuple(pair) for pair in self.age_targets))
+        if self.weekday_scale is not None:
+            object.__setattr__(self, "weekday_scale", tuple(self.weekday_scale))
+        if self.comparator not in COMPARATORS:
+            raise ValueError(f"unknown comparator {self.comparator!r}")
+        if self.weekday_scale is not None and len(self.weekday_scale) != DAYS_PER_WEEK:
+            raise ValueError("weekday_scale needs one factor per weekday")
+
+
+@dataclass
+class GoalResults:
+    """Per-goal, per-user outcomes, each array shaped (goals, users)."""
+    names: tuple[str, ...]
+    achievement_rate: np.ndarray
+    longest_streak: np.ndarray
+    current_streak: np.ndarray
+
+    def goal_index(self, name: str) -> int:
+        return self.names.index(name)
+
+    def consistent_users(self, name: str, min_rate: float = 80) -> np.ndarray:
+        """Users meeting a goal on more than min_rate % of days."""
+        return np.flatnonzero(self.achievement_rate[self.goal_index(name)] > min_rate)
+
+
+def streaks(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Longest and current (trailing) run of True along the last axis.
+
+    Run lengths come from a cumulative count reset at every False via a
+    running maximum, so the whole batch is handled without Python loops."""
+    counts = np.cumsum(mask, axis=-1)
+    resets = np.maximum.accumulate(np.where(mask, 0, counts), axis=-1)
+    runs = counts - resets
+    longest = runs.max(axis=-1) if mask.shape[-1] else np.zeros(mask.shape[:-1], dtype=np.int64)
+    current = runs[..., -1] if mask.shape[-1] else longest
+    return longest, current
+
+
+class GoalEngine:
+    """Evaluates many goals at once as one broadcasted threshold tensor.
+
+    Goals are compiled into per-goal arrays (metric index, comparator sign,
+    strictness, age-band targets, weekday factors). For each block of users
+    the thresholds form a (goals, users, days) tensor compared against the
+    matching metric values in a single vectorized step."""
+
+    def __init__(self, goals: Sequence[Goal], metric_names: Sequence[str], metadata_columns: Sequence[str] = METADATA_COLUMNS):
+        if not goals:
+            raise ValueError("at least one goal is required")
+        self.goals = tuple(goals)
+        self._metrics = np.array([list(metric_names).index(goal.metric) for goal in goals])
+        self._signs = np.array([COMPARATORS[goal.comparator][0] for goal in goals], dtype=np.float64)
+        self._strict = np.array([COMPARATORS[goal.comparator][1] for goal in goals])
+        self._weekday_scale = np.array(
+            [goal.weekday_scale or (1.0,) * DAYS_PER_WEEK for goal in goals], dtype=np.float64
+        )
+        self._age_column = list(metadata_columns).index("age") if "age" in metadata_columns else None
+
+        # Age bands padded to a rectangle; +inf bounds never match
+        bands = max(len(goal.age_targets) for goal in goals)
+        self._age_bounds = np.full((len(goals), bands), np.inf)
+        self._age_values = np.zeros((len(goals), bands + 1))
+        for g, goal in enumerate(goals):
+            ordered = sorted(goal.age_targets)
+            self._age_values[g, 0] = goal.target
+            for b, (min_age, target) in enumerate(ordered):
+                self._age_bounds[g, b] = min_age
+                self._age_values[g, b + 1] = target
+        if bands and self._age_column is None:
+            raise ValueError("age targets need an 'age' metadata column")
+
+    def user_targets(self, user_metadata: np.ndarray) -> np.ndarray:
+        """Base target of every goal for every user, shape (goals, users)."""
+        n_users = len(user_metadata)
+        if not self._age_bounds.shape[1]:
+            return np.broadcast_to(self._age_values[:, :1], (len(self.goals), n_users))
+        ages = np.asarray(user_metadata[:, self._age_column], dtype=np.float64)
+        band = (ages[None, :, None] >= self._age_bounds[:, None, :]).sum(axis=2)
+        return np.take_along_axis(self._age_values, band, axis=1)
+
+    def thresholds(self, user_metadata: np.ndarray, n_days: int, start_weekday: int = 0) -> np.ndarray:
+        """Threshold tensor of shape (goals, users, days)."""
+        weekdays = (start_weekday + np.arange(n_days)) % DAYS_PER_WEEK
+        return self.user_targets(user_metadata)[:, :, None] * self._weekday_scale[:, None, weekdays]
+
+    def evaluate(
+        self,
+        data: np.ndarray,
+        user_metadata: np.ndarray,
+        start_weekday: int = 0,
+        max_block_elements: int = MAX_BLOCK_ELEMENTS,
+    ) -> GoalResults:
+        """Achievement rate (% of days), longest and current streak of every
+        goal for every user of a (users, days, metrics) tensor.
+        start_weekday is the weekday of day 0 (0 = Monday). NaN never meets a goal."""
+        n_users, n_days, _ = data.shape
+        n_goals = len(self.goals)
+        rates = np.empty((n_goals, n_users))
+        longest = np.empty((n_goals, n_users), dtype=np.int64)
+        current = np.empty((n_goals, n_users), dtype=np.int64)
+        block_users = max(1, max_block_elements // max(1, n_goals * n_days))
+
+        for start, block in iter_user_blocks(data, block_users):
+            stop = start + len(block)
+            values = np.moveaxis(block[:, :, self._metrics], 2, 0) * self._signs[:, None, None]
+            limits = self.thresholds(user_metadata[start:stop], n_days, start_weekday) * self._signs[:, None, None]
+            met = np.where(self._strict[:, None, None], values > limits, values >= limits)
+            rates[:, start:stop] = met.sum(axis=2) / n_days * 100
+            longest[:, start:stop], current[:, start:stop] = streaks(met)
+
+        return GoalResults(tuple(goal.name for goal in self.goals), rates, longest, current)
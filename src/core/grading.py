@@ -0,0 +1,49 @@
+import numpy as np
+
+from ..constants import SCORE_GRADES
+
+
+class GradingScale:
+    """Grading scale compiled once into contiguous bin edges.
+
+    Only the lower bound of each grade is used, so every average falls into
+    exactly one grade: a grade covers [its lower bound, next lower bound).
+    Averages below the lowest bound get the lowest grade."""
+
+    def __init__(self, grades: dict[str, tuple[float, float]] = SCORE_GRADES):
+        if not grades:
+            raise ValueError("grading scale needs at least one grade")
+        ordered = sorted(grades, key=lambda grade: grades[grade][0])
+        lower_bounds = [grades[grade][0] for grade in ordered]
+        if len(set(lower_bounds)) != len(lower_bounds):
+            raise ValueError("grade lower bounds must be distinct")
+
+        # Grades keep their declaration order for histograms and reports
+        self.grades = tuple(grades)
+        self.labels = np.array(self.grades, dtype=object)
+        self._edges = np.array(lower_bounds[1:], dtype=np.float64)
+        self._bin_codes = np.array([self.grades.index(grade) for grade in ordered], dtype=np.intp)
+
+    def codes(self, averages: np.ndarray) -> np.ndarray:
+        """Grade indexes (into self.grades) for an array of averages."""
+        bins = np.searchsorted(self._edges, averages, side="right")
+        return self._bin_codes[bins]
+
+    def assign(self, averages: np.ndarray) -> np.ndarray:
+        """Letter grades for an array of averages."""
+        return self.labels[self.codes(averages)]
+
+    def grade(self, average: float) -> str:
+        """Letter grade for a single average."""
+        return self.grades[int(self.codes(average))]
+
+    def count(self, codes: np.ndarray) -> np.ndarray:
+        """Histogram of grade codes, one count per grade."""
+        return np.bincount(codes, minlength=len(self.grades))
+
+    def histogram(self, averages: np.ndarray) -> dict[str, int]:
+        """Map each grade to the number of averages that earn it."""
+        return dict(zip(self.grades, self.count(self.codes(averages)).tolist()))
+
+
+DEFAULT_SCALE = GradingScale(SCORE_GRADES)
@@ -0,0 +1,69 @@
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from ..types import Report
+from .report_engine import ReportAccumulator
+from .student_table import StudentTable
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def read_csv_rows(path: str | Path) -> Iterator[tuple[str, str, int, list[int]]]:
+    """Yield (id, name, attendance, scores) rows from a CSV roster.
+    Expected columns: id, name, attendance, then one column per score."""
+    with open(path, newline="") as file:
+        reader = csv.reader(file)
+        next(reader, None)  # header
+        for record in reader:
+            if not record:
+                continue
+            student_id, name, attendance, *scores = record
+            yield student_id, name, int(attendance), [int(score) for score in scores]
+
+
+def read_jsonl_rows(path: str | Path) -> Iterator[tuple[str, str, int, list[int]]]:
+    """Yield (id, name, attendance, scores) rows from a JSON-lines roster.
+    Each line is an object with id, name, attendance and scores keys."""
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield record["id"], record["name"], int(record["attendance"]), record["scores"]
+
+
+def read_rows(path: str | Path) -> Iterator[tuple[str, str, int, list[int]]]:
+    """Pick the row reader from the file extension (.csv, .jsonl or .ndjson)."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return read_csv_rows(path)
+    if suffix in (".jsonl", ".ndjson"):
+        return read_jsonl_rows(path)
+    raise ValueError(f"unsupported roster format: {suffix}")
+
+
+def iter_roster_chunks(
+    rows: Iterable[tuple[str, str, int, list[int]]], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[StudentTable]:
+    """Group rows into StudentTable chunks of at most chunk_size students."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    rows = iter(rows)
+    while True:
+        chunk = StudentTable.from_rows(islice(rows, chunk_size))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def stream_report(path: str | Path, chunk_size: int = DEFAULT_CHUNK_SIZE, top_n: int = 5) -> Report:
+    """Generate a Report from a CSV or JSON-lines roster without loading it whole.
+    Only one chunk is resident at a time; the failed-student list is the only
+    part of the result that grows with the file."""
+    accumulator = ReportAccumulator(top_n)
+    for chunk in iter_roster_chunks(read_rows(path), chunk_size):
+        accumulator.update(chunk)
+    return accumulator.to_report()
@@ -0,0 +1,195 @@
+from fractions import Fraction
+from typing import NamedTuple
+
+import numpy as np
+
+from ..constants import PASSING_AVERAGE, PASSING_ATTENDANCE, MAX_ATTENDANCE
+from ..types import Report, student_dict_T
+from .grading import GradingScale, DEFAULT_SCALE
+from .report_engine import format_failure_reason
+from .selection import top_k
+from .student_table import SCORE_DTYPE, StudentTable
+
+
+class _Entry(NamedTuple):
+    name: str
+    attendance: int
+    scores: tuple[int, ...]
+    average: Fraction
+    attendance_rate: float
+    passed: bool
+    grade: int
+
+
+class _ScoreMultiset:
+    """Multiset of scores kept as one count per possible score (the
+    SCORE_DTYPE range), so memory is fixed however many updates arrive;
+    min/max scan the counts."""
+
+    def __init__(self):
+        info = np.iinfo(SCORE_DTYPE)
+        self._offset = info.min
+        self._counts = np.zeros(info.max - info.min + 1, dtype=np.int64)
+
+    def check(self, values):
+        """Refuse scores the counts cannot hold."""
+        if any(not 0 <= value - self._offset < len(self._counts) for value in values):
+            raise ValueError(f"scores out of range for {np.dtype(SCORE_DTYPE).name}")
+
+    def add(self, values):
+        np.add.at(self._counts, np.asarray(values, dtype=np.int64) - self._offset, 1)
+
+    def remove(self, values):
+        np.subtract.at(self._counts, np.asarray(values, dtype=np.int64) - self._offset, 1)
+
+    def min(self):
+        present = np.flatnonzero(self._counts)
+        return int(present[0]) + self._offset if len(present) else None
+
+    def max(self):
+        present = np.flatnonzero(self._counts)
+        return int(present[-1]) + self._offset if len(present) else None
+
+
+class LiveReport(Report):
+    """Report kept up to date as students are added, changed or removed.
+
+    Counts, class average, attendance rate, grade distribution, failed
+    students and min/max score are maintained per change in O(1) (the
+    score extremes scan a fixed 256-entry histogram), instead of
+    regenerating the whole report. Averages are summed as exact fractions so repeated updates do
+    not drift. Only top_performers is computed on access, in O(n log k)."""
+
+    def __init__(
+        self,
+        students: dict[student_dict_T] | StudentTable | None = None,
+        scale: GradingScale = DEFAULT_SCALE,
+        top_n: int = 5,
+    ):
+        self.students_data = None
+        self.scale = scale
+        self.top_n = top_n
+        self._entries: dict[str, _Entry] = {}
+        self._failed: dict[str, _Entry] = {}
+        self._passed_count = 0
+        self._average_sum = Fraction(0)
+        self._attendance_total = 0
+        self._grade_counts = [0] * len(scale.grades)
+        self._scores = _ScoreMultiset()
+
+        for student_id, student_data in (students or {}).items():
+            self.add_student(student_id, student_data["name"], student_data["attendance"], student_data["scores"])
+
+    def add_student(self, student_id: str, name: str, attendance: int, scores: list[int]):
+        """Add a new student to the report."""
+        if student_id in self._entries:
+            raise KeyError(f"student {student_id} already exists")
+        self._store(student_id, self._entry(name, attendance, scores))
+
+    def update_scores(self, student_id: str, scores: list[int]):
+        """Replace a student's scores."""
+        old = self._entries[student_id]
+        # Validate before touching the totals so a rejected update changes nothing
+        new = self._entry(old.name, old.attendance, scores)
+        self._retract(student_id, old)
+        self._store(student_id, new)
+
+    def update_attendance(self, student_id: str, attendance: int):
+        """Replace a student's attended days."""
+        old = self._entries[student_id]
+        # Validate before touching the totals so a rejected update changes nothing
+        new = self._entry(old.name, attendance, old.scores)
+        self._retract(student_id, old)
+        self._store(student_id, new)
+
+    def remove_student(self, student_id: str):
+        """Drop a student from the report."""
+        self._retract(student_id, self._entries[student_id])
+        del self._entries[student_id]
+        self._failed.pop(student_id, None)
+
+    def _entry(self, name: str, attendance: int, scores) -> _Entry:
+        scores = tuple(int(score) for score in scores)
+        if not scores:
+            raise ValueError("a student needs at least one score")
+        self._scores.check(scores)
+        average = Fraction(sum(scores), len(scores))
+        attendance_rate = attendance / MAX_ATTENDANCE * 100
+        passed = average >= PASSING_AVERAGE and attendance_rate >= PASSING_ATTENDANCE
+        grade = int(self.scale.codes(float(average)))
+        return _Entry(str(name), int(attendance), scores, average, attendance_rate, passed, grade)
+
+    def _store(self, student_id: str, entry: _Entry):
+        """Add an entry's contribution; an existing id keeps its position."""
+        self._entries[student_id] = entry
+        self._passed_count += entry.passed
+        self._average_sum += entry.average
+        self._attendance_total += entry.attendance
+        self._grade_counts[entry.grade] += 1
+        self._scores.add(entry.scores)
+        if entry.passed:
+            self._failed.pop(student_id, None)
+        else:
+            self._failed[student_id] = entry
+
+    def _retract(self, student_id: str, entry: _Entry):
+        """Remove an entry's contribution from the running totals."""
+        self._passed_count -= entry.passed
+        self._average_sum -= entry.average
+        self._attendance_total -= entry.attendance
+        self._grade_counts[entry.grade] -= 1
+        self._scores.remove(entry.scores)
+
+    @property
+    def total_students(self) -> int:
+        return len(self._entries)
+
+    @property
+    def passed_count(self) -> int:
+        return self._passed_count
+
+    @property
+    def failed_count(self) -> int:
+        return self.total_students - self._passed_count
+
+    @property
+    def passed_rate(self) -> float:
+        return self._passed_count / self.total_students * 100 if self.total_students else 0.0
+
+    @property
+    def failed_rate(self) -> float:
+        return self.failed_count / self.total_students * 100 if self.total_students else 0.0
+
+    @property
+    def class_average(self) -> float:
+        return float(self._average_sum / self.total_students) if self.total_students else 0.0
+
+    @property
+    def average_attendance_rate(self) -> float:
+        if not self.total_students:
+            return 0.0
+        return self._attendance_total / MAX_ATTENDANCE * 100 / self.total_students
+
+    @property
+    def highest_score(self) -> int | None:
+        return self._scores.max()
+
+    @property
+    def lowest_score(self) -> int | None:
+        return self._scores.min()
+
+    @property
+    def grade_distribution(self) -> dict[str, int]:
+        return dict(zip(self.scale.grades, self._grade_counts))
+
+    @property
+    def failed_students(self) -> list[dict[str, str]]:
+        return [
+            {"id": student_id, "name": entry.name, "reason": format_failure_reason(float(entry.average), entry.attendance_rate)}
+            for student_id, entry in self._failed.items()
+        ]
+
+    @property
+    def top_performers(self) -> list[tuple[str, float]]:
+        ranked = top_k(self._entries.values(), self.top_n, key=lambda entry: entry.average)
+        return [(entry.name, float(entry.average)) for entry in ranked]
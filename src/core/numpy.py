@@ -1,11 +1,19 @@
 from typing import Any
 import numpy as np
 
+from .covariance import CovarianceAccumulator
+from .describe import describe
+from .periods import aggregate_periods, period_buckets, to_day
+from .rolling import rolling_mean
+from .sales_cube import SalesCube
+
 random_generator = np.random.default_rng(42)
 np.random.seed(42)
 
 
 temperature_data = random_generator.uniform(-10.0, 40.0, size=(365, 5))
+# Calendar date of the first temperature reading
+TEMPERATURE_START = "2023-01-01"
 identity_matrix = np.eye(5)
 evenly_spaced = np.linspace(0, 100, 50)
 sales_matrix = random_generator.integers(1000, 5000, size=(12, 4))
@@ -27,12 +35,14 @@ def print_general_info(temperature_data, identity_matrix, evenly_spaced, sales_m
     print("evenly spaced values from 0 to 100:")
     print(evenly_spaced)
 
-def basic_slicing(temperature_data):
-    january_data = temperature_data[:31, :]
+def basic_slicing(temperature_data, start=TEMPERATURE_START):
+    n_days = len(temperature_data)
+    year = str(to_day(start).astype("M8[Y]"))
+    january_data = period_buckets(start, n_days, "month").select(temperature_data, f"{year}-01")
 
     # June-August
-    summer_data = temperature_data[152:243, :]
-    weekend_data = temperature_data[5::7, :]
+    summer_data = period_buckets(start, n_days, "season").select(temperature_data, f"summer {year}")
+    weekend_data = period_buckets(start, n_days, "weekpart").select(temperature_data, "weekend")
 
     print("January shape:", january_data.shape)
     print("Summer shape:", summer_data.shape)
@@ -55,21 +65,15 @@ def boolean_indexing(
     print(low_temp_date_quantity)
     print(temperature_data_cleaned)
 
-def indexing(temperature_data: np.ndarray[tuple[Any, ...], np.dtype[np.float64]]):
+def indexing(temperature_data: np.ndarray[tuple[Any, ...], np.dtype[np.float64]], start=TEMPERATURE_START):
     # Specific days
     specific_days_idx = np.array([0, 1, 97, 150, 310])
     specific_days_data = temperature_data[specific_days_idx, :]
     print("Data for specific days:")
     print(specific_days_data)
     
-    #  Quarterlt averages
-    quarters = [
-        temperature_data[0:91, :],  
-        temperature_data[91:182, :],  
-        temperature_data[182:274, :],  
-        temperature_data[274:365, :],  
-    ]
-    quarterly_averages = np.array([q.mean(axis=0) for q in quarters])
+    #  Quarterly averages
+    quarterly_averages = aggregate_periods(temperature_data, start, "quarter")["mean"]
     print("Quarterly averages:\n", quarterly_averages)
 
     # Rearange cities by annual average temperature
@@ -80,64 +84,64 @@ def indexing(temperature_data: np.ndarray[tuple[Any, ...], np.dtype[np.float64]]
     print("Sorted city indices (desc):", sorted_city_indexes)
     
 def temperature_analysis(temperature_data: np.ndarray[tuple[Any, ...], np.dtype[np.float64]]):
-    mean_per_city = temperature_data.mean(axis=0)
-    median_per_city = np.median(temperature_data, axis=0)
-    std_per_city = temperature_data.std(axis=0)
+    per_city = describe(temperature_data, axis=0, percentiles=())
+    mean_per_city = per_city.mean
+    median_per_city = per_city.median
+    std_per_city = per_city.std
     
     print("Mean per city:", mean_per_city)
     print("Median per city:", median_per_city)
     print("Std deviation per city:", std_per_city)  
     
-    hottest_day_idx = np.argmax(temperature_data.max(axis=1))
-    hottest_day_temp = temperature_data[hottest_day_idx].max()
+    overall = describe(temperature_data, axis=None, percentiles=())
+    n_cities = temperature_data.shape[1]
+    hottest_day_idx = overall.argmax // n_cities
+    hottest_day_temp = overall.max
     print(f"Hottest day: Day {hottest_day_idx}, Temperature: {hottest_day_temp:.2f}")
 
-    coldest_day_idx = np.argmin(temperature_data.min(axis=1))
-    coldest_day_temp = temperature_data[coldest_day_idx].min()
+    coldest_day_idx = overall.argmin // n_cities
+    coldest_day_temp = overall.min
     print(f"Coldest day: Day {coldest_day_idx}, Temperature: {coldest_day_temp:.2f}")
     
-    correlation_matrix = np.corrcoef(temperature_data.T)
+    correlation_matrix = CovarianceAccumulator(temperature_data.shape[1]).update(temperature_data).correlation()
     print("Correlation between cities:\n", correlation_matrix)
     
-def sales_analysis(sales_matrix: np.ndarray[tuple[Any, ...], np.dtype[np.float64]]):
+def sales_analysis(sales_matrix: np.ndarray[tuple[Any, ...], np.dtype[np.float64]] | SalesCube):
+    # Month x product cube; its prefix sums answer every total below without rescanning
+    cube = sales_matrix if isinstance(sales_matrix, SalesCube) else SalesCube(sales_matrix, ("month", "product"))
 
-    total_sales_per_product = sales_matrix.sum(axis=0)
+    total_sales_per_product = cube.totals("product")
     print("Total sales:", total_sales_per_product)
 
   
-    avg_sales_per_product = sales_matrix.mean(axis=0)
+    avg_sales_per_product = total_sales_per_product / cube.shape[0]
     print("Average sales:", avg_sales_per_product)
 
     # 3) Best performing month 
-    total_sales_per_month = sales_matrix.sum(axis=1)
-    best_month_idx = np.argmax(total_sales_per_month)
+    best_month_idx, best_month_total = cube.best("month")
     print( best_month_idx)
-    print( total_sales_per_month[best_month_idx])
+    print( best_month_total)
 
     # 4) Best performing category
-    best_product_idx = np.argmax(total_sales_per_product)
+    best_product_idx, best_product_total = cube.best("product")
     print("Best performing index", best_product_idx)
-    print("Total sales of that product:", total_sales_per_product[best_product_idx])
+    print("Total sales of that product:", best_product_total)
     
     
 def advanced_computations(temperature_data: np.ndarray[tuple[Any, ...], np.dtype[np.float64]]):
     window_size = 7
-    moving_avg = np.array([
-        np.convolve(temperature_data[:, i], np.ones(window_size)/window_size, mode='valid')
-        for i in range(temperature_data.shape[1])
-    ]).T  
+    moving_avg = rolling_mean(temperature_data, window_size, axis=0)
 
     print("7-day moving average shape:", moving_avg.shape)
 
     # 2) Compute z-scores for each  temperatures
-    mean_per_city = temperature_data.mean(axis=0)
-    std_per_city = temperature_data.std(axis=0)
-    z_scores = (temperature_data - mean_per_city) / std_per_city
+    per_city = describe(temperature_data, axis=0, percentiles=(25, 50, 75))
+    z_scores = (temperature_data - per_city.mean) / per_city.std
 
     print("Z-scores shape:", z_scores.shape)
 
     # 3) Percentiles (25th, 50th, 75th) 
-    percentiles = np.percentile(temperature_data, [25, 50, 75], axis=0)
+    percentiles = per_city.percentiles
     print("Percentiles (25th, 50th, 75th):\n", percentiles)
     
 def main():
@@ -0,0 +1,137 @@
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .analyzer import ActivityAnalyzer, goal_achievement, summarize_users, cached_stage
+from .dataset import DEFAULT_BLOCK_USERS, iter_user_blocks
+
+# Tensor view of the shared block, attached once per worker process
+_worker_memory = None
+_worker_data = None
+
+
+def _release(memory: shared_memory.SharedMemory):
+    try:
+        memory.close()
+    except BufferError:
+        pass
+    memory.unlink()
+
+
+class SharedTensor:
+    """Copy of an array placed in multiprocessing shared memory so worker
+    processes can map it by name without pickling or copying it.
+    The segment is unlinked by close() or when the object is collected."""
+
+    def __init__(self, array: np.ndarray, block_users: int = DEFAULT_BLOCK_USERS):
+        self.shape = array.shape
+        self.dtype = array.dtype
+        # Sized from shape and dtype: a CompactTensor source decodes to float64
+        size = int(np.prod(self.shape)) * self.dtype.itemsize
+        self._memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._memory.buf)
+        # Copy in blocks so a memory-mapped source is never fully resident twice
+        for start, block in iter_user_blocks(array, block_users):
+            self.array[start:start + len(block)] = block
+        self._finalizer = weakref.finalize(self, _release, self._memory)
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def close(self):
+        self.array = None
+        self._finalizer()
+
+
+def _attach(name: str, shape: tuple, dtype: str):
+    global _worker_memory, _worker_data
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_data = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_worker_memory.buf)
+
+
+def _user_block(start: int, stop: int, goals: list[tuple[int, float]]):
+    block = _worker_data[start:stop]
+    means, stds = summarize_users(block, len(block))
+    return start, means, stds, goal_achievement(block, goals, len(block))
+
+
+def parallel_user_stats(
+    shared: SharedTensor,
+    goals: list[tuple[int, float]],
+    workers: int | None = None,
+    block_users: int = DEFAULT_BLOCK_USERS,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-user metric means, stds and goal achievement rates computed by a
+    process pool over blocks of users of a shared tensor.
+    Returns (means, stds, goal_rates)."""
+    n_users, n_days, n_metrics = shared.shape
+    workers = workers or os.cpu_count() or 1
+    means = np.empty((n_users, n_metrics))
+    stds = np.empty((n_users, n_metrics))
+    rates = np.empty(n_users)
+    # Several blocks per worker keep the pool busy when blocks finish unevenly
+    block_users = max(1, min(block_users, -(-n_users // (workers * 4))))
+    starts = range(0, n_users, block_users)
+
+    with ProcessPoolExecutor(workers, initializer=_attach, initargs=(shared.name, shared.shape, shared.dtype.str)) as pool:
+        futures = [pool.submit(_user_block, start, min(start + block_users, n_users), goals) for start in starts]
+        for future in futures:
+            start, block_means, block_stds, block_rates = future.result()
+            stop = start + len(block_rates)
+            means[start:stop], stds[start:stop], rates[start:stop] = block_means, block_stds, block_rates
+    return means, stds, rates
+
+
+class ParallelActivityAnalyzer(ActivityAnalyzer):
+    """ActivityAnalyzer whose per-user statistics run on a process pool.
+
+    The cleaned tensor is copied once into shared memory; workers map it
+    and each computes means, stds and goal rates for blocks of users in a
+    single pass. Population-level steps (z-score normalisation, rankings)
+    reduce the gathered per-user results in the parent. Call close() (or
+    use it as a context manager) to release the shared segment early."""
+
+    _GOAL_STAGES = ActivityAnalyzer._GOAL_STAGES + ("_per_user_pass",)
+
+    def __init__(self, *args, workers: int | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.workers = workers
+
+    @cached_stage
+    def _shared_data(self) -> SharedTensor:
+        return SharedTensor(self.cleaned_data, self.block_users)
+
+    @cached_stage
+    def _per_user_pass(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        goals = [(self.dataset.metric_index(metric), minimum) for metric, minimum in self._goals.items()]
+        return parallel_user_stats(self._shared_data, goals, self.workers, self.block_users)
+
+    @cached_stage
+    def _user_summary(self) -> tuple[np.ndarray, np.ndarray]:
+        means, stds, _ = self._per_user_pass
+        return means, stds
+
+    @cached_stage
+    def goal_achievement_rate(self) -> np.ndarray:
+        """Percentage of days each user meets every goal."""
+        return self._per_user_pass[2]
+
+    def invalidate(self, *stages: str):
+        shared = self._cache.get("_shared_data")
+        super().invalidate(*stages)
+        if shared is not None and "_shared_data" not in self._cache:
+            shared.close()
+
+    def close(self):
+        """Release the shared-memory copy of the tensor."""
+        self.invalidate("_shared_data")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,151 @@
+import datetime
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+FREQUENCIES = ("week", "month", "quarter", "season", "weekpart")
+# Meteorological seasons; December belongs to the following year's winter
+SEASONS = ("winter", "spring", "summer", "autumn")
+WEEKPARTS = ("weekday", "weekend")
+PERIOD_STATS = ("mean", "min", "max", "std")
+# 1970-01-01 (day 0 of datetime64) was a Thursday
+_EPOCH_WEEKDAY = 3
+
+
+def to_day(start: str | datetime.date | np.datetime64) -> np.datetime64:
+    """Day-resolution datetime64 from a date, datetime64 or 'YYYY-MM-DD'."""
+    return np.datetime64(start, "D")
+
+
+@dataclass
+class PeriodBuckets:
+    """Calendar bucket of every day of a daily series.
+    codes[i] is the index into labels of day i."""
+    freq: str
+    labels: tuple[str, ...]
+    codes: np.ndarray
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Number of days in every bucket."""
+        return np.bincount(self.codes, minlength=len(self.labels))
+
+    def select(self, data: np.ndarray, label: str, axis: int = 0) -> np.ndarray:
+        """The days of `data` that fall in one bucket."""
+        return np.compress(self.codes == self.labels.index(label), data, axis=axis)
+
+
+def period_buckets(start: str | datetime.date | np.datetime64, n_days: int, freq: str) -> PeriodBuckets:
+    """Assign n_days consecutive days from `start` to calendar periods.
+
+    Weeks start on Monday and are labelled by that Monday's date, months
+    as 'YYYY-MM', quarters as 'YYYY-Qn' and seasons as e.g. 'winter 2024'
+    (December 2023 - February 2024). "weekpart" splits weekdays from
+    weekends. Day arithmetic is done on datetime64, so leap years and any
+    start date are handled by the calendar itself."""
+    if freq not in FREQUENCIES:
+        raise ValueError(f"freq must be one of {FREQUENCIES}")
+    days = (to_day(start) + np.arange(n_days)).astype(np.int64)
+
+    if freq == "weekpart":
+        weekend = (days + _EPOCH_WEEKDAY) % 7 >= 5
+        return PeriodBuckets(freq, WEEKPARTS, weekend.astype(np.intp))
+
+    # Absolute period number of every day, then labels for the covered range
+    if freq == "week":
+        periods = (days + _EPOCH_WEEKDAY) // 7
+        label = lambda week: str(np.datetime64(week * 7 - _EPOCH_WEEKDAY, "D"))
+    else:
+        months = days.astype("M8[D]").astype("M8[M]").astype(np.int64)
+        if freq == "month":
+            periods = months
+            label = lambda month: str(np.datetime64(month, "M"))
+        elif freq == "quarter":
+            periods = months // 3
+            label = lambda quarter: f"{1970 + quarter // 4}-Q{quarter % 4 + 1}"
+        else:
+            periods = (months + 1) // 3
+            label = lambda season: f"{SEASONS[season % 4]} {1970 + season // 4}"
+
+    if not n_days:
+        return PeriodBuckets(freq, (), np.zeros(0, dtype=np.intp))
+    first = int(periods[0])
+    labels = tuple(label(period) for period in range(first, int(periods[-1]) + 1))
+    return PeriodBuckets(freq, labels, (periods - first).astype(np.intp))
+
+
+@dataclass
+class PeriodStats:
+    """Grouped statistics; every value has the bucket axis in place of the
+    time axis. Percentiles are stored under keys like "p25"."""
+    labels: tuple[str, ...]
+    counts: np.ndarray
+    values: dict[str, np.ndarray]
+
+    def __getitem__(self, stat: str) -> np.ndarray:
+        return self.values[stat]
+
+
+def aggregate_periods(
+    data: np.ndarray,
+    start: str | datetime.date | np.datetime64,
+    freq: str,
+    stats: Sequence[str] = ("mean",),
+    percentiles: Sequence[float] = (),
+    axis: int = 0,
+) -> PeriodStats:
+    """Mean, min, max, std (population) and linear-interpolated percentiles
+    of daily `data` per calendar period.
+
+    Days are grouped into contiguous runs (a stable reorder for weekpart)
+    and every statistic is one ufunc.reduceat over all buckets and series
+    at once. Buckets without days get NaN. Percentiles assume finite data."""
+    unknown = set(stats) - set(PERIOD_STATS)
+    if unknown:
+        raise ValueError(f"unknown statistics {sorted(unknown)}; choose from {PERIOD_STATS}")
+    data = np.moveaxis(np.asarray(data, dtype=np.float64), axis, 0)
+    buckets = period_buckets(start, len(data), freq)
+    codes = buckets.codes
+    if np.any(codes[1:] < codes[:-1]):
+        order = np.argsort(codes, kind="stable")
+        data, codes = data[order], codes[order]
+
+    counts = buckets.counts
+    present = counts > 0
+    starts = (np.cumsum(counts) - counts)[present]
+    sizes = counts[present].reshape((-1,) + (1,) * (data.ndim - 1))
+
+    def per_bucket(values):
+        result = np.full((len(counts),) + data.shape[1:], np.nan)
+        result[present] = values
+        return np.moveaxis(result, 0, axis)
+
+    out = {}
+    if "mean" in stats or "std" in stats:
+        mean = np.add.reduceat(data, starts, axis=0) / sizes
+        if "mean" in stats:
+            out["mean"] = per_bucket(mean)
+        if "std" in stats:
+            deviations = data - np.repeat(mean, counts[present], axis=0)
+            out["std"] = per_bucket(np.sqrt(np.add.reduceat(deviations ** 2, starts, axis=0) / sizes))
+    if "min" in stats:
+        out["min"] = per_bucket(np.minimum.reduceat(data, starts, axis=0))
+    if "max" in stats:
+        out["max"] = per_bucket(np.maximum.reduceat(data, starts, axis=0))
+
+    if len(percentiles) and len(data):
+        # Sort by value, then stably by bucket: values end up sorted within each bucket
+        by_value = np.argsort(data, axis=0, kind="stable")
+        within = np.argsort(codes[by_value], axis=0, kind="stable")
+        ordered = np.take_along_axis(data, np.take_along_axis(by_value, within, axis=0), axis=0)
+        for q in percentiles:
+            position = starts + q / 100 * (counts[present] - 1)
+            low = np.floor(position).astype(np.intp)
+            high = np.minimum(low + 1, starts + counts[present] - 1)
+            fraction = (position - low).reshape(sizes.shape)
+            out[f"p{q:g}"] = per_bucket(ordered[low] + (ordered[high] - ordered[low]) * fraction)
+    elif len(percentiles):
+        out.update({f"p{q:g}": per_bucket(data[:0]) for q in percentiles})
+
+    return PeriodStats(buckets.labels, counts, out)
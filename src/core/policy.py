@@ -0,0 +1,196 @@
+from abc import abstractmethod
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+
+from ..constants import PASSING_AVERAGE, PASSING_ATTENDANCE, MAX_ATTENDANCE
+from ..types import FailingCase, FailureReason, SubjectStatus, student_dict_T
+from .student_table import StringColumn, StudentTable, concat_columns
+
+REASON_LABELS = {
+    FailureReason.PASSED: "Passed",
+    FailureReason.LOW_AVERAGE: FailingCase.LOW_AVERAGE.value,
+    FailureReason.LOW_ATTENDANCE: FailingCase.LOW_ATTENDANCE.value,
+    FailureReason.BOTH: f"{FailingCase.LOW_AVERAGE.value}, {FailingCase.LOW_ATTENDANCE.value}",
+}
+
+
+def failure_codes(
+    averages: np.ndarray,
+    attendance_rates: np.ndarray,
+    passing_average: float = PASSING_AVERAGE,
+    passing_attendance: float = PASSING_ATTENDANCE,
+) -> np.ndarray:
+    """FailureReason code of every student as a uint8 array."""
+    low_average = np.asarray(averages) < passing_average
+    low_attendance = np.asarray(attendance_rates) < passing_attendance
+    return low_average.astype(np.uint8) | (low_attendance.astype(np.uint8) << 1)
+
+
+def format_reason(code: int, average: float, attendance_rate: float) -> str:
+    """Failure reason text for a code; only called when printing."""
+    average = round(float(average), 2)
+    attendance_rate = round(float(attendance_rate), 2)
+    if code == FailureReason.LOW_AVERAGE:
+        return f'{FailingCase.LOW_AVERAGE.value} ({average}%)'
+    if code == FailureReason.LOW_ATTENDANCE:
+        return f'{FailingCase.LOW_ATTENDANCE.value} ({attendance_rate}%)'
+    return f'{FailingCase.LOW_AVERAGE.value}({average}) , {FailingCase.LOW_ATTENDANCE.value} ({attendance_rate}%)'
+
+
+class _ReasonColumns(Sequence):
+    """FailureReason codes with the averages and attendance rates their
+    text needs; entries are formatted only when read."""
+
+    def __init__(self, codes: np.ndarray, averages: np.ndarray, attendance_rates: np.ndarray):
+        self.codes = codes
+        self.averages = averages
+        self.attendance_rates = attendance_rates
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._entry(row) for row in range(*index.indices(len(self)))]
+        return self._entry(range(len(self))[index])
+
+    @abstractmethod
+    def _entry(self, row: int):
+        """The formatted entry of one row."""
+
+    def reason(self, row: int) -> str:
+        return format_reason(self.codes[row], self.averages[row], self.attendance_rates[row])
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(mine == theirs for mine, theirs in zip(self, other))
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class Eligibility(_ReasonColumns):
+    """(passed, reason) of every student, as calculate_total_eligibility
+    returns it."""
+
+    @classmethod
+    def of(cls, table: StudentTable, max_attandance: int = MAX_ATTENDANCE) -> "Eligibility":
+        averages = table.averages()
+        attendance_rates = table.attendance_rates(max_attandance)
+        return cls(failure_codes(averages, attendance_rates), averages, attendance_rates)
+
+    def _entry(self, row: int) -> tuple[bool, str]:
+        return (False, self.reason(row)) if self.codes[row] else (True, SubjectStatus.PASS.value)
+
+
+class FailedStudents(_ReasonColumns):
+    """Students who did not pass, kept as columns (id, name, code, average,
+    attendance rate); the {"id", "name", "reason"} dicts are built on access."""
+
+    def __init__(self, ids: StringColumn | np.ndarray, names: StringColumn, codes: np.ndarray, averages: np.ndarray, attendance_rates: np.ndarray):
+        super().__init__(codes, averages, attendance_rates)
+        self.ids = ids
+        self.names = names
+
+    @classmethod
+    def select(cls, table: StudentTable, codes: np.ndarray, averages: np.ndarray, attendance_rates: np.ndarray) -> "FailedStudents":
+        """The failing rows of a table, given every student's code."""
+        rows = np.flatnonzero(codes)
+        return cls(table.ids.take(rows), table.names.take(rows), codes[rows], averages[rows], attendance_rates[rows])
+
+    @classmethod
+    def concat(cls, parts: Sequence["FailedStudents"]) -> "FailedStudents":
+        if not parts:
+            empty = StringColumn.from_strings([])
+            return cls(empty, empty, np.empty(0, dtype=np.uint8), np.empty(0), np.empty(0))
+        if len(parts) == 1:
+            return parts[0]
+        ids, names, *numbers = zip(*(part._columns() for part in parts))
+        return cls(concat_columns(ids), concat_columns(names), *(np.concatenate(column) for column in numbers))
+
+    def _columns(self) -> tuple:
+        return self.ids, self.names, self.codes, self.averages, self.attendance_rates
+
+    def _entry(self, row: int) -> dict[str, str]:
+        return {"id": self.ids.item(row), "name": self.names.item(row), "reason": self.reason(row)}
+
+
+@dataclass
+class PolicySweep:
+    """Outcome of every (average cutoff, attendance cutoff) pair.
+    reason_counts[code, i, j] counts students with FailureReason `code`
+    under average_thresholds[i] and attendance_thresholds[j]."""
+    average_thresholds: np.ndarray
+    attendance_thresholds: np.ndarray
+    reason_counts: np.ndarray
+
+    @property
+    def passed(self) -> np.ndarray:
+        return self.reason_counts[FailureReason.PASSED]
+
+    @property
+    def failed(self) -> np.ndarray:
+        return self.reason_counts[1:].sum(axis=0)
+
+    def breakdown(self, i: int, j: int) -> dict[str, int]:
+        """Student count per outcome label for one grid cell."""
+        return {REASON_LABELS[code]: int(self.reason_counts[code, i, j]) for code in FailureReason}
+
+    def rows(self) -> Iterator[tuple[float, float, dict[str, int]]]:
+        """(average cutoff, attendance cutoff, breakdown) for every cell."""
+        for i, average in enumerate(self.average_thresholds.tolist()):
+            for j, attendance in enumerate(self.attendance_thresholds.tolist()):
+                yield average, attendance, self.breakdown(i, j)
+
+
+def _threshold_bins(values: np.ndarray, thresholds: np.ndarray) -> tuple[np.ndarray, np.ndarray, int]:
+    # Bin of every value among the sorted distinct thresholds, the sorted
+    # position of each caller threshold and the number of bins.
+    # value < thresholds[k] exactly when its bin is <= position[k].
+    distinct, position = np.unique(thresholds, return_inverse=True)
+    return np.searchsorted(distinct, values, side="right"), position.reshape(-1), len(distinct) + 1
+
+
+def sweep_policies(
+    students: dict[student_dict_T] | StudentTable,
+    average_thresholds: Sequence[float],
+    attendance_thresholds: Sequence[float],
+    max_attandance: int = MAX_ATTENDANCE,
+) -> PolicySweep:
+    """Pass/fail counts and failure-reason breakdown for every combination
+    of average and attendance cutoffs in one computation.
+
+    Each student is binned once against the sorted distinct cutoffs of
+    each grid (binary search), the students are counted into a 2-D
+    histogram of (average bin, attendance bin), and a 2-D cumulative sum
+    of it gives, for every cell, how many students are below both cutoffs.
+    The cost is O(n log grid) for the binning plus O(1) per cell, instead
+    of a full report per candidate policy."""
+    table = students if isinstance(students, StudentTable) else StudentTable.from_dict(students)
+    average_thresholds = np.asarray(average_thresholds, dtype=np.float64).reshape(-1)
+    attendance_thresholds = np.asarray(attendance_thresholds, dtype=np.float64).reshape(-1)
+
+    average_bins, average_position, n_average_bins = _threshold_bins(table.averages(), average_thresholds)
+    attendance_bins, attendance_position, n_attendance_bins = _threshold_bins(
+        table.attendance_rates(max_attandance), attendance_thresholds
+    )
+    shape = (n_average_bins, n_attendance_bins)
+
+    joint = np.bincount(
+        np.ravel_multi_index((average_bins, attendance_bins), shape), minlength=shape[0] * shape[1]
+    ).reshape(shape)
+    below = joint.cumsum(axis=0).cumsum(axis=1)
+    low_both = below[np.ix_(average_position, attendance_position)]
+    low_average = below[average_position, -1][:, None]
+    low_attendance = below[-1, attendance_position][None, :]
+
+    reason_counts = np.empty((len(FailureReason), len(average_thresholds), len(attendance_thresholds)), dtype=np.int64)
+    reason_counts[FailureReason.BOTH] = low_both
+    reason_counts[FailureReason.LOW_AVERAGE] = low_average - low_both
+    reason_counts[FailureReason.LOW_ATTENDANCE] = low_attendance - low_both
+    reason_counts[FailureReason.PASSED] = len(table) - low_average - low_attendance + low_both
+    return PolicySweep(average_thresholds, attendance_thresholds, reason_counts)
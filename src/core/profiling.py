@@ -0,0 +1,206 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# ANALYTICS_PROFILE=1 turns timing on at import; =memory also traces allocations.
+# ANALYTICS_PROFILE_OUT and ANALYTICS_CPROFILE_OUT name files written at exit.
+PROFILE_ENV = "ANALYTICS_PROFILE"
+PROFILE_OUT_ENV = "ANALYTICS_PROFILE_OUT"
+CPROFILE_OUT_ENV = "ANALYTICS_CPROFILE_OUT"
+
+_enabled = False
+_trace_memory = False
+_stages: dict[str, "StageStats"] = {}
+_stack: list["_Frame"] = []
+_started = time.perf_counter()
+
+
+@dataclass
+class StageStats:
+    """Accumulated timings of one stage path (e.g. "generate_report/build_report").
+    peak_bytes is the highest traced allocation total while the stage ran,
+    recorded only when memory tracing is on."""
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    peak_bytes: int = 0
+
+
+class _Frame:
+    __slots__ = ("path", "start", "peak")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.start = time.perf_counter()
+        self.peak = 0
+
+
+def enable(trace_memory: bool = False):
+    """Start recording stages. With trace_memory, tracemalloc also records
+    the allocation high-water mark of every stage (much slower)."""
+    global _enabled, _trace_memory
+    _enabled = True
+    _trace_memory = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _enabled, _trace_memory
+    _enabled = False
+    if _trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _trace_memory = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Forget every recorded stage."""
+    global _started
+    _stages.clear()
+    _started = time.perf_counter()
+
+
+def _enter(name: str, root: bool = False) -> _Frame:
+    path = f"{_stack[-1].path}/{name}" if _stack and not root else name
+    if _trace_memory:
+        # Hand the peak so far to the enclosing stage before measuring this one
+        if _stack:
+            _stack[-1].peak = max(_stack[-1].peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    frame = _Frame(path)
+    _stack.append(frame)
+    return frame
+
+
+def _exit(frame: _Frame):
+    elapsed = time.perf_counter() - frame.start
+    _stack.pop()
+    stats = _stages.setdefault(frame.path, StageStats())
+    stats.calls += 1
+    stats.total_seconds += elapsed
+    stats.max_seconds = max(stats.max_seconds, elapsed)
+    if _trace_memory:
+        peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+        stats.peak_bytes = max(stats.peak_bytes, peak)
+        if _stack:
+            _stack[-1].peak = max(_stack[-1].peak, peak)
+
+
+@contextmanager
+def _recorded(name: str, root: bool = False):
+    frame = _enter(name, root)
+    try:
+        yield
+    finally:
+        _exit(frame)
+
+
+class _Disabled:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_DISABLED = _Disabled()
+
+
+def stage(name: str, root: bool = False):
+    """Context manager timing a block as a stage; nested stages are
+    recorded under "outer/inner". With root=True the stage keeps its own
+    name wherever it runs, for work (like memoized results) whose caller
+    varies between runs; its own nested stages still hang below it.
+    A shared no-op when profiling is off."""
+    return _recorded(name, root) if _enabled else _DISABLED
+
+
+def timed(name: str | None = None):
+    """Decorator recording every call of a function as a stage.
+    When profiling is off the only cost is one flag check per call."""
+    def decorate(function):
+        label = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _recorded(label):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def max_rss_bytes() -> int | None:
+    """Process resident-set high-water mark, where the OS reports it."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def profile() -> dict:
+    """The current run as a JSON-serialisable dict."""
+    return {
+        "enabled": _enabled,
+        "trace_memory": _trace_memory,
+        "wall_seconds": time.perf_counter() - _started,
+        "max_rss_bytes": max_rss_bytes(),
+        "stages": {path: asdict(stats) for path, stats in _stages.items()},
+    }
+
+
+def write_profile(path: str):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(profile(), file, indent=2)
+
+
+@contextmanager
+def cprofile(path: str):
+    """Run a block under cProfile and dump the stats to `path`
+    (readable with pstats or snakeviz)."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+def _configure_from_env():
+    setting = os.environ.get(PROFILE_ENV, "").lower()
+    if setting in ("", "0", "false", "off"):
+        return
+    enable(trace_memory=setting == "memory")
+    if os.environ.get(PROFILE_OUT_ENV):
+        atexit.register(write_profile, os.environ[PROFILE_OUT_ENV])
+    if os.environ.get(CPROFILE_OUT_ENV):
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def dump():
+            profiler.disable()
+            profiler.dump_stats(os.environ[CPROFILE_OUT_ENV])
+
+        atexit.register(dump)
+
+
+_configure_from_env()
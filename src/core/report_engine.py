@@ -0,0 +1,158 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from itertools import repeat
+
+import numpy as np
+
+from ..constants import MAX_ATTENDANCE
+from ..types import Report
+from .grading import GradingScale, DEFAULT_SCALE
+from .policy import FailedStudents, failure_codes, format_reason
+from .profiling import timed
+from .student_table import StudentTable
+from .selection import top_k_indices
+
+
+def format_failure_reason(average: float, attendance_rate: float) -> str:
+    """Build the failure reason text for a student that did not pass."""
+    return format_reason(int(failure_codes(average, attendance_rate)), average, attendance_rate)
+
+
+class ReportAccumulator:
+    """Running totals that turn a stream of StudentTable chunks into a Report.
+    Only the counters, the grade histogram, a bounded top-N heap and the
+    failed-student list are kept, so memory does not grow with the number
+    of passing students."""
+
+    def __init__(self, top_n: int = 5, scale: GradingScale = DEFAULT_SCALE):
+        self.top_n = top_n
+        self.scale = scale
+        self.total_students = 0
+        self.passed_count = 0
+        self.average_sum = 0.0
+        self.attendance_rate_sum = 0.0
+        self.highest_score = None
+        self.lowest_score = None
+        self.grade_counts = np.zeros(len(scale.grades), dtype=np.int64)
+        # FailedStudents per chunk; reasons are only formatted when the report is read
+        self._failed_parts = []
+        # Min-heap of (average, -row, name); earlier rows win ties
+        self._top_heap = []
+
+    def update(self, table: StudentTable) -> "ReportAccumulator":
+        """Fold one StudentTable chunk into the running totals."""
+        if len(table) == 0:
+            return self
+
+        averages = table.averages()
+        attendance_rates = table.attendance_rates(MAX_ATTENDANCE)
+        codes = failure_codes(averages, attendance_rates)
+        passed = codes == 0
+
+        self.passed_count += int(passed.sum())
+        self.average_sum += float(averages.sum())
+        self.attendance_rate_sum += float(attendance_rates.sum())
+
+        highest, lowest = int(table.scores.max()), int(table.scores.min())
+        self.highest_score = highest if self.highest_score is None else max(self.highest_score, highest)
+        self.lowest_score = lowest if self.lowest_score is None else min(self.lowest_score, lowest)
+
+        self.grade_counts += self.scale.count(self.scale.codes(averages))
+
+        if not passed.all():
+            self._failed_parts.append(FailedStudents.select(table, codes, averages, attendance_rates))
+
+        # Only the chunk's own top rows can enter the overall top N
+        for row in top_k_indices(averages, self.top_n):
+            entry = (float(averages[row]), -(self.total_students + int(row)), table.names.item(row))
+            if len(self._top_heap) < self.top_n:
+                heapq.heappush(self._top_heap, entry)
+            else:
+                heapq.heappushpop(self._top_heap, entry)
+
+        self.total_students += len(table)
+        return self
+
+    def merge(self, other: "ReportAccumulator") -> "ReportAccumulator":
+        """Combine two accumulators into a new one, treating `other`'s students
+        as coming after this one's. The operation is associative, so partial
+        results (shards, schools) can be reduced in any grouping."""
+        if self.top_n != other.top_n or self.scale.grades != other.scale.grades:
+            raise ValueError("can only merge accumulators with the same top_n and grading scale")
+
+        merged = ReportAccumulator(self.top_n, self.scale)
+        merged.total_students = self.total_students + other.total_students
+        merged.passed_count = self.passed_count + other.passed_count
+        merged.average_sum = self.average_sum + other.average_sum
+        merged.attendance_rate_sum = self.attendance_rate_sum + other.attendance_rate_sum
+        highs = [score for score in (self.highest_score, other.highest_score) if score is not None]
+        lows = [score for score in (self.lowest_score, other.lowest_score) if score is not None]
+        merged.highest_score = max(highs) if highs else None
+        merged.lowest_score = min(lows) if lows else None
+        merged.grade_counts = self.grade_counts + other.grade_counts
+        merged._failed_parts = self._failed_parts + other._failed_parts
+
+        # Shift the other side's rows behind ours so ties still favour earlier students
+        shifted = [(average, neg_row - self.total_students, name) for average, neg_row, name in other._top_heap]
+        merged._top_heap = heapq.nlargest(self.top_n, self._top_heap + shifted)
+        heapq.heapify(merged._top_heap)
+        return merged
+
+    __add__ = merge
+
+    @property
+    def failed_students(self) -> FailedStudents:
+        """Every failed student so far, in arrival order."""
+        return FailedStudents.concat(self._failed_parts)
+
+    def to_report(self, students_data=None) -> Report:
+        """Build the Report from the accumulated totals."""
+        total_students = self.total_students
+        failed_count = total_students - self.passed_count
+
+        return Report(
+            students_data,
+            total_students,
+            self.passed_count,
+            self.passed_count / total_students * 100,
+            failed_count,
+            failed_count / total_students * 100,
+            self.average_sum / total_students,
+            self.highest_score,
+            self.lowest_score,
+            self.attendance_rate_sum / total_students,
+            top_performers=[(name, average) for average, _, name in sorted(self._top_heap, reverse=True)],
+            grade_distribution=dict(zip(self.scale.grades, self.grade_counts.tolist())),
+            failed_students=self.failed_students,
+            scale=self.scale,
+        )
+
+
+@timed()
+def build_report(table: StudentTable, top_n: int = 5, scale: GradingScale = DEFAULT_SCALE) -> Report:
+    """Compute every Report field and print_report section from a StudentTable
+    with vectorized column operations instead of per-student loops."""
+    return ReportAccumulator(top_n, scale).update(table).to_report(table)
+
+
+def _shard_accumulator(table: StudentTable, top_n: int, scale: GradingScale) -> ReportAccumulator:
+    """Worker entry point: partial statistics for one shard."""
+    return ReportAccumulator(top_n, scale).update(table)
+
+
+@timed()
+def build_report_parallel(
+    table: StudentTable, workers: int | None = None, top_n: int = 5, scale: GradingScale = DEFAULT_SCALE
+) -> Report:
+    """Same as build_report, but shards the table across a process pool and
+    reduces the workers' partial accumulators into the final Report."""
+    workers = workers or os.cpu_count() or 1
+    shards = table.split(workers)
+    if len(shards) <= 1:
+        return build_report(table, top_n, scale)
+
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        partials = executor.map(_shard_accumulator, shards, repeat(top_n), repeat(scale))
+        return reduce(ReportAccumulator.merge, partials).to_report(table)
@@ -0,0 +1,94 @@
+import warnings
+from typing import Iterable
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+ROLLING_STATS = ("mean", "std", "min", "max")
+# Rounding error of a window sum taken as a difference of cumulative sums,
+# in units of eps times the running total
+CANCELLATION_ULPS = 8
+
+
+def _cumulative(values: np.ndarray) -> np.ndarray:
+    """Cumulative sums along the last axis with a leading zero."""
+    cumulative = np.cumsum(values, axis=-1)
+    return np.concatenate([np.zeros(values.shape[:-1] + (1,), dtype=cumulative.dtype), cumulative], axis=-1)
+
+
+def _window_sums(cumulative: np.ndarray, window: int) -> np.ndarray:
+    """Sums over every full window along the last axis, from a _cumulative result."""
+    return cumulative[..., window:] - cumulative[..., :-window]
+
+
+def rolling_stats(
+    data: np.ndarray,
+    windows: int | Iterable[int],
+    axis: int = 0,
+    stats: Iterable[str] = ("mean",),
+) -> dict[int, dict[str, np.ndarray]]:
+    """Rolling statistics over `axis` of a 1-D, 2-D or 3-D array for one or
+    more window sizes. Windows are "valid" only (like np.convolve mode="valid"),
+    so the output axis has n - window + 1 entries.
+
+    mean and std come from cumulative sums of counts, values and squares
+    shared by every window size (O(n) per series); a variance below the
+    rounding error of those sums is reported as 0. min and max use
+    sliding_window_view. NaNs are ignored; a window with no values gives NaN.
+    Returns {window: {stat: array}}."""
+    windows = [windows] if isinstance(windows, int) else list(windows)
+    stats = tuple(stats)
+    unknown = set(stats) - set(ROLLING_STATS)
+    if unknown:
+        raise ValueError(f"unknown rolling stats: {sorted(unknown)}")
+
+    values = np.moveaxis(np.asarray(data, dtype=np.float64), axis, -1)
+    n = values.shape[-1]
+    for window in windows:
+        if not 1 <= window <= n:
+            raise ValueError(f"window {window} must be between 1 and {n}")
+
+    present = ~np.isnan(values)
+    has_nan = not present.all()
+    if "mean" in stats or "std" in stats:
+        # Centre each series before summing to limit cancellation in long cumulative sums
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            offset = np.nanmean(values, axis=-1, keepdims=True)
+        offset = np.nan_to_num(offset)
+        centred = np.where(present, values - offset, 0.0)
+        cumulative_counts = _cumulative(present.astype(np.int64)) if has_nan else None
+        cumulative_values = _cumulative(centred)
+    if "std" in stats:
+        cumulative_squares = _cumulative(centred * centred)
+
+    results = {}
+    for window in windows:
+        result = {}
+        if "mean" in stats or "std" in stats:
+            counts = _window_sums(cumulative_counts, window) if has_nan else np.full(n - window + 1, window)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                centred_mean = _window_sums(cumulative_values, window) / counts
+                if "mean" in stats:
+                    result["mean"] = np.where(counts > 0, centred_mean + offset, np.nan)
+                if "std" in stats:
+                    variance = _window_sums(cumulative_squares, window) / counts - centred_mean ** 2
+                    # Below the rounding error of the cumulative sums a variance is cancellation noise
+                    noise = CANCELLATION_ULPS * np.finfo(np.float64).eps * cumulative_squares[..., window:] / counts
+                    variance = np.where(variance > noise, variance, 0.0)
+                    result["std"] = np.where(counts > 0, np.sqrt(variance), np.nan)
+        if "min" in stats or "max" in stats:
+            view = sliding_window_view(values, window, axis=-1)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                if "min" in stats:
+                    result["min"] = np.nanmin(view, axis=-1) if has_nan else view.min(axis=-1)
+                if "max" in stats:
+                    result["max"] = np.nanmax(view, axis=-1) if has_nan else view.max(axis=-1)
+        results[window] = {stat: np.moveaxis(result[stat], -1, axis) for stat in stats}
+    return results
+
+
+def rolling_mean(data: np.ndarray, window: int, axis: int = 0) -> np.ndarray:
+    """Rolling mean over `axis` for a single window size."""
+    return rolling_stats(data, window, axis, ("mean",))[window]["mean"]
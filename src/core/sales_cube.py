@@ -0,0 +1,141 @@
+from itertools import product
+from typing import Sequence
+
+import numpy as np
+
+# A selection on one dimension: an index, a contiguous slice or a list of indices
+Selection = int | slice | Sequence[int]
+
+
+class SalesCube:
+    """Sales figures over any number of dimensions (e.g. day x store x
+    product x region), the first being time.
+
+    Only a zero-padded prefix-sum table (summed-area table) is kept:
+    prefix[i0, i1, ...] is the sum of values[:i0, :i1, ...]. The sum over
+    any box of contiguous ranges is then an inclusion-exclusion over its
+    2**ndim corners, independent of the box size; index lists cost one box
+    per listed index. New periods are appended along the time axis without
+    touching the existing table (amortised growth like a list)."""
+
+    def __init__(self, values: np.ndarray, dimensions: Sequence[str] | None = None):
+        values = np.asarray(values)
+        if values.ndim < 1:
+            raise ValueError("a sales cube needs at least one dimension")
+        self.dimensions = tuple(dimensions) if dimensions is not None else tuple(f"axis{i}" for i in range(values.ndim))
+        if len(self.dimensions) != values.ndim:
+            raise ValueError("need one dimension name per axis")
+        dtype = np.int64 if np.issubdtype(values.dtype, np.integer) or values.dtype == bool else np.float64
+        self._prefix = np.zeros((values.shape[0] + 1,) + tuple(n + 1 for n in values.shape[1:]), dtype=dtype)
+        self._length = 0
+        self.append(values)
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return (self._length,) + tuple(n - 1 for n in self._prefix.shape[1:])
+
+    @property
+    def ndim(self) -> int:
+        return len(self.dimensions)
+
+    @property
+    def prefix(self) -> np.ndarray:
+        """The summed-area table, shape (n0 + 1, n1 + 1, ...)."""
+        return self._prefix[:self._length + 1]
+
+    def axis(self, dimension: str | int) -> int:
+        return dimension if isinstance(dimension, int) else self.dimensions.index(dimension)
+
+    def append(self, values: np.ndarray):
+        """Add periods along the time axis; a single period may be given
+        without the time axis. Cost is proportional to the new data only.
+        Fractional values added to an integer cube switch it to float64."""
+        values = np.asarray(values)
+        if not np.can_cast(values.dtype, self._prefix.dtype, "same_kind"):
+            if not np.can_cast(values.dtype, np.float64, "same_kind"):
+                raise ValueError(f"cannot add {values.dtype} values to a {self._prefix.dtype} sales cube")
+            self._prefix = self._prefix.astype(np.float64)
+        if values.shape == self.shape[1:]:
+            values = values[None]
+        if values.shape[1:] != self.shape[1:]:
+            raise ValueError(f"periods must have shape {self.shape[1:]}")
+        added = len(values)
+        if self._length + added + 1 > len(self._prefix):
+            grown = np.zeros((max(2 * len(self._prefix), self._length + added + 1),) + self._prefix.shape[1:], self._prefix.dtype)
+            grown[:self._length + 1] = self.prefix
+            self._prefix = grown
+
+        # Prefix sums of the new periods over the other axes, then carried down the time axis
+        block = np.zeros((added,) + self._prefix.shape[1:], self._prefix.dtype)
+        inner = values.astype(self._prefix.dtype)
+        for axis in range(1, values.ndim):
+            inner = np.cumsum(inner, axis=axis)
+        block[(slice(None),) + (slice(1, None),) * (values.ndim - 1)] = inner
+        start = self._length + 1
+        self._prefix[start:start + added] = self._prefix[self._length] + np.cumsum(block, axis=0)
+        self._length += added
+
+    def _segments(self, axis: int, selection: Selection | None) -> tuple[np.ndarray, np.ndarray]:
+        # (starts, stops) of the contiguous ranges a selection covers on one axis
+        size = self.shape[axis]
+        if selection is None:
+            return np.array([0]), np.array([size])
+        if isinstance(selection, slice):
+            start, stop, step = selection.indices(size)
+            if step != 1:
+                raise ValueError("slices must be contiguous")
+            return np.array([start]), np.array([max(start, stop)])
+        indices = np.atleast_1d(np.asarray(selection, dtype=np.intp))
+        if np.any((indices < -size) | (indices >= size)):
+            raise IndexError(f"index out of range for dimension {self.dimensions[axis]!r}")
+        indices = indices % size if size else indices
+        return indices, indices + 1
+
+    def _box_sums(self, segments: list[tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        # Sum of every combination of segments, shape (k0, k1, ...)
+        prefix = self.prefix
+        total = 0
+        for corner in product((0, 1), repeat=self.ndim):
+            index = np.ix_(*[stops if high else starts for high, (starts, stops) in zip(corner, segments)])
+            sign = -1 if (self.ndim - sum(corner)) % 2 else 1
+            total = total + sign * prefix[index]
+        return np.asarray(total)
+
+    def _selection(self, selection: dict[str, Selection]) -> list[tuple[np.ndarray, np.ndarray]]:
+        unknown = set(selection) - set(self.dimensions)
+        if unknown:
+            raise ValueError(f"unknown dimensions {sorted(unknown)}")
+        return [self._segments(axis, selection.get(name)) for axis, name in enumerate(self.dimensions)]
+
+    def _items(self, axis: int, selection: dict[str, Selection]) -> np.ndarray:
+        # Indices of one dimension covered by the selection (all when unselected)
+        items = np.arange(self.shape[axis])
+        name = self.dimensions[axis]
+        return np.atleast_1d(items[selection[name]]) if name in selection else items
+
+    def sum(self, **selection: Selection):
+        """Total over a selection per dimension, e.g.
+        cube.sum(month=slice(0, 3), product=[0, 2]); unselected
+        dimensions are summed entirely."""
+        return self._box_sums(self._selection(selection)).sum()
+
+    def totals(self, dimension: str | int, **selection: Selection) -> np.ndarray:
+        """Total of every item of one dimension (e.g. every month), over
+        the selection on the others."""
+        axis = self.axis(dimension)
+        segments = self._selection(selection)
+        items = self._items(axis, selection)
+        segments[axis] = (items, items + 1)
+        sums = self._box_sums(segments)
+        return sums.sum(axis=tuple(i for i in range(self.ndim) if i != axis))
+
+    def best(self, dimension: str | int, **selection: Selection) -> tuple[int, float]:
+        """(index, total) of the item of `dimension` with the highest total
+        over the selection; indices refer to the whole dimension."""
+        axis = self.axis(dimension)
+        items = self._items(axis, selection)
+        totals = self.totals(axis, **selection)
+        if not len(totals):
+            raise ValueError(f"no {self.dimensions[axis]} selected")
+        best = int(np.argmax(totals))
+        return int(items[best]), totals[best].item()
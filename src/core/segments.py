@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from typing import Iterator, Sequence
+
+import numpy as np
+
+# Daily step bands (sedentary ... highly active)
+ACTIVITY_LEVEL_EDGES = (5000, 7500, 10000, 12500)
+ACTIVITY_LEVEL_LABELS = ("sedentary", "low active", "somewhat active", "active", "highly active")
+AGE_BAND_EDGES = (30, 40, 50, 60)
+AGE_BAND_LABELS = ("<30", "30-39", "40-49", "50-59", "60+")
+
+
+@dataclass
+class Segmentation:
+    """Assignment of every user to one of `labels` by integer code."""
+    name: str
+    labels: tuple[str, ...]
+    codes: np.ndarray
+
+
+def binned(name: str, values: np.ndarray, edges: Sequence[float], labels: Sequence[str]) -> Segmentation:
+    """Segment users by which of the bins between `edges` their value falls in."""
+    if len(labels) != len(edges) + 1:
+        raise ValueError("binning needs one more label than edges")
+    return Segmentation(name, tuple(labels), np.digitize(values, edges))
+
+
+def activity_levels(mean_steps: np.ndarray, edges=ACTIVITY_LEVEL_EDGES, labels=ACTIVITY_LEVEL_LABELS) -> Segmentation:
+    """Activity level of every user from their mean daily steps."""
+    return binned("activity", mean_steps, edges, labels)
+
+
+def age_bands(ages: np.ndarray, edges=AGE_BAND_EDGES, labels=AGE_BAND_LABELS) -> Segmentation:
+    """Age band of every user."""
+    return binned("age", ages, edges, labels)
+
+
+def categories(name: str, values: np.ndarray) -> Segmentation:
+    """One segment per distinct value (e.g. the gender column)."""
+    unique, codes = np.unique(values, return_inverse=True)
+    labels = tuple(str(int(value)) if float(value).is_integer() else str(value) for value in unique)
+    return Segmentation(name, labels, codes.reshape(-1))
+
+
+@dataclass
+class SegmentTable:
+    """Grouped aggregates over the cross product of several segmentations.
+    count and goal_rate have one axis per dimension; mean and std add a
+    trailing metric axis."""
+    dimensions: tuple[str, ...]
+    labels: tuple[tuple[str, ...], ...]
+    count: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+    goal_rate: np.ndarray | None = None
+
+    def rows(self) -> Iterator[tuple[tuple[str, ...], int, np.ndarray, np.ndarray, float | None]]:
+        """Non-empty cells as (labels, count, mean, std, goal_rate)."""
+        for cell in zip(*np.nonzero(self.count)):
+            labels = tuple(self.labels[axis][index] for axis, index in enumerate(cell))
+            goal_rate = None if self.goal_rate is None else float(self.goal_rate[cell])
+            yield labels, int(self.count[cell]), self.mean[cell], self.std[cell], goal_rate
+
+
+def cross_tab(
+    segmentations: Sequence[Segmentation], values: np.ndarray, goal_rates: np.ndarray | None = None
+) -> SegmentTable:
+    """Count, mean and std of per-user `values` (users, metrics) and the mean
+    goal rate for every combination of segments.
+
+    Segment codes are folded into one flat group id and every aggregate is a
+    single np.bincount over users, so there is no Python loop over users or
+    groups. Empty cells have count 0 and NaN statistics."""
+    if not segmentations:
+        raise ValueError("at least one segmentation is required")
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    n_users, n_metrics = values.shape
+    shape = tuple(len(segmentation.labels) for segmentation in segmentations)
+    n_groups = int(np.prod(shape))
+    groups = np.ravel_multi_index([segmentation.codes for segmentation in segmentations], shape)
+
+    count = np.bincount(groups, minlength=n_groups)
+    # One bincount per statistic over (group, metric) cells
+    cells = (groups[:, None] * n_metrics + np.arange(n_metrics)).ravel()
+    sums = np.bincount(cells, weights=values.ravel(), minlength=n_groups * n_metrics).reshape(n_groups, n_metrics)
+    squares = np.bincount(cells, weights=(values * values).ravel(), minlength=n_groups * n_metrics).reshape(n_groups, n_metrics)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = sums / count[:, None]
+        std = np.sqrt(np.maximum(squares / count[:, None] - mean ** 2, 0))
+        goal_rate = None
+        if goal_rates is not None:
+            goal_rate = (np.bincount(groups, weights=goal_rates, minlength=n_groups) / count).reshape(shape)
+
+    return SegmentTable(
+        tuple(segmentation.name for segmentation in segmentations),
+        tuple(segmentation.labels for segmentation in segmentations),
+        count.reshape(shape),
+        mean.reshape(shape + (n_metrics,)),
+        std.reshape(shape + (n_metrics,)),
+        goal_rate,
+    )
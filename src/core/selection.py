@@ -0,0 +1,64 @@
+import heapq
+from typing import Callable, Iterable, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+def _identity(item):
+    return item
+
+
+def top_k(items: Iterable[T], k: int, key: Callable[[T], float] | None = None) -> list[T]:
+    """Return the k largest items, best first, in O(n log k).
+    Equal keys keep their input order."""
+    key = key or _identity
+    ranked = heapq.nlargest(k, enumerate(items), key=lambda pair: (key(pair[1]), -pair[0]))
+    return [item for _, item in ranked]
+
+
+def bottom_k(items: Iterable[T], k: int, key: Callable[[T], float] | None = None) -> list[T]:
+    """Return the k smallest items, lowest first, in O(n log k).
+    Equal keys keep their input order."""
+    key = key or _identity
+    ranked = heapq.nsmallest(k, enumerate(items), key=lambda pair: (key(pair[1]), pair[0]))
+    return [item for _, item in ranked]
+
+
+def _select_indices(values: np.ndarray, k: int, largest: bool) -> np.ndarray:
+    """Partition-based selection of k indices of a 1-D array.
+    Costs O(n + k log k); NaN values are not supported."""
+    values = np.asarray(values)
+    n = values.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    if largest:
+        kth = np.partition(values, n - k)[n - k]
+        strict = np.flatnonzero(values > kth)
+    else:
+        kth = np.partition(values, k - 1)[k - 1]
+        strict = np.flatnonzero(values < kth)
+    # Fill the remaining slots with the earliest indices equal to the boundary value
+    ties = np.flatnonzero(values == kth)[: k - len(strict)]
+    rows = np.sort(np.concatenate([strict, ties]))
+
+    selected = values[rows]
+    if largest:
+        # Stable descending order: reverse a stable sort of the reversed selection
+        order = len(rows) - 1 - np.argsort(selected[::-1], kind="stable")[::-1]
+    else:
+        order = np.argsort(selected, kind="stable")
+    return rows[order]
+
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, best first; ties keep the lower index first."""
+    return _select_indices(values, k, largest=True)
+
+
+def bottom_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k smallest values, lowest first; ties keep the lower index first."""
+    return _select_indices(values, k, largest=False)
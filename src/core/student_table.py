@@ -0,0 +1,272 @@
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+
+from ..types import Student, student_dict_T
+
+SCORE_DTYPE = np.uint8
+ATTENDANCE_DTYPE = np.int16
+OFFSET_DTYPE = np.int64
+
+
+class StringColumn:
+    """Variable-length strings stored as one UTF-8 byte buffer plus the
+    (n + 1) offsets delimiting each value, so a column costs the encoded
+    text and 8 bytes per row whatever its longest value.
+
+    Indexing a row decodes it; slicing returns a view over the same buffer."""
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str]) -> "StringColumn":
+        if isinstance(values, np.ndarray):
+            values = values.tolist()
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=OFFSET_DTYPE)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    @classmethod
+    def concat(cls, columns: Sequence["StringColumn"]) -> "StringColumn":
+        if not columns:
+            return cls.from_strings([])
+        sizes = [column.offsets[-1] - column.offsets[0] for column in columns]
+        starts = np.cumsum([0] + sizes[:-1])
+        offsets = np.concatenate(
+            [np.zeros(1, dtype=OFFSET_DTYPE)]
+            + [column.offsets[1:] - column.offsets[0] + start for column, start in zip(columns, starts)]
+        )
+        return cls(np.concatenate([column._bytes() for column in columns]), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.take(np.arange(start, stop, step))
+            stop = max(start, stop)
+            offsets = self.offsets[start:stop + 1]
+            return StringColumn(self.data[offsets[0]:offsets[-1]], offsets - offsets[0])
+        return self.item(index)
+
+    def item(self, row: int) -> str:
+        row = range(len(self))[row]
+        return self.data[self.offsets[row]:self.offsets[row + 1]].tobytes().decode("utf-8")
+
+    def _bytes(self) -> np.ndarray:
+        return self.data[self.offsets[0]:self.offsets[-1]]
+
+    def take(self, rows: np.ndarray) -> "StringColumn":
+        """Copy of the given rows."""
+        rows = np.asarray(rows, dtype=np.intp)
+        starts, stops = self.offsets[rows], self.offsets[rows + 1]
+        offsets = np.zeros(len(rows) + 1, dtype=OFFSET_DTYPE)
+        np.cumsum(stops - starts, out=offsets[1:])
+        # Position in self.data of every byte of the result
+        positions = np.arange(offsets[-1]) + np.repeat(starts - offsets[:-1], stops - starts)
+        return StringColumn(self.data[positions], offsets)
+
+    def tolist(self) -> list[str]:
+        raw = self._bytes().tobytes()
+        bounds = (self.offsets - self.offsets[0]).tolist()
+        return [raw[start:stop].decode("utf-8") for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes().nbytes + self.offsets.nbytes
+
+    def __repr__(self) -> str:
+        return f"StringColumn({self.tolist()!r})"
+
+
+class StudentRecord:
+    """Zero-copy view of one StudentTable row.
+    Supports both attribute access and the dict-style access
+    (record["scores"]) used across data_transfom."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "StudentTable", row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def id(self) -> str | int:
+        return self._table.ids.item(self._row)
+
+    @property
+    def name(self) -> str:
+        return self._table.names.item(self._row)
+
+    @property
+    def attendance(self) -> int:
+        return int(self._table.attendance[self._row])
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self._table.scores[self._row]
+
+    def __getitem__(self, key: str):
+        if key not in ("name", "attendance", "scores"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_student(self) -> Student:
+        """Copy the row out into a standalone Student."""
+        return Student(self.name, self.attendance, self.scores.tolist())
+
+    def __repr__(self) -> str:
+        return f"StudentRecord(id={self.id!r}, name={self.name!r}, attendance={self.attendance}, scores={self.scores.tolist()})"
+
+
+class StudentTable:
+    """Roster stored as contiguous typed columns: UTF-8 StringColumns for
+    names and string ids (int ids stay an int64 array, so they remain int
+    keys), an int16 attendance vector and a (students, scores) uint8 matrix.
+
+    Behaves like the students dict (keys, values, items, [id]) and yields
+    StudentRecord views, so every data_transfom function accepts it.
+    The id index is built on the first lookup by id."""
+
+    def __init__(self, ids, names, attendance: np.ndarray, scores: np.ndarray):
+        self.ids = _id_column(ids)
+        self.names = names if isinstance(names, StringColumn) else StringColumn.from_strings(names)
+        self.attendance = attendance
+        self.scores = scores
+        self._index = None
+
+    @classmethod
+    def from_dict(cls, students: dict[student_dict_T]) -> "StudentTable":
+        """Load a students dict in a single walk.
+        Every student must have the same number of whole-number scores
+        (0-255) and whole-number attendance; other rosters raise ValueError."""
+        return cls.from_rows(
+            (student_id, student_data["name"], student_data["attendance"], student_data["scores"])
+            for student_id, student_data in students.items()
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[str, str, int, list[int]]]) -> "StudentTable":
+        """Build a table from (id, name, attendance, scores) rows."""
+        ids, names, attendance, score_rows = [], [], [], []
+
+        for student_id, name, attended, scores in rows:
+            ids.append(student_id)
+            names.append(name)
+            attendance.append(attended)
+            score_rows.append(scores)
+
+        if len({len(scores) for scores in score_rows}) > 1:
+            raise ValueError("all students must have the same number of scores")
+        n = len(ids)
+        scores = np.array(score_rows).reshape(n, -1) if n else np.empty((0, 0), dtype=np.int64)
+        attendance = np.array(attendance)
+
+        return cls(
+            ids,
+            names,
+            _narrow(attendance, ATTENDANCE_DTYPE, "attendance"),
+            _narrow(scores, SCORE_DTYPE, "scores"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids.tolist())
+
+    def __contains__(self, student_id: str) -> bool:
+        return student_id in self.index
+
+    def __getitem__(self, student_id: str) -> StudentRecord:
+        return StudentRecord(self, self.index[student_id])
+
+    @property
+    def index(self) -> dict[str | int, int]:
+        """Map of student id to row, built once on first use."""
+        if self._index is None:
+            self._index = {student_id: row for row, student_id in enumerate(self.ids.tolist())}
+            if len(self._index) != len(self.ids):
+                raise ValueError("student ids must be unique")
+        return self._index
+
+    def get(self, student_id: str, default=None):
+        row = self.index.get(student_id)
+        return default if row is None else StudentRecord(self, row)
+
+    def keys(self) -> Iterator[str]:
+        return iter(self)
+
+    def values(self) -> Iterator[StudentRecord]:
+        return (StudentRecord(self, row) for row in range(len(self)))
+
+    def items(self) -> Iterator[tuple[str, StudentRecord]]:
+        return zip(self.ids.tolist(), self.values())
+
+    def record(self, row: int) -> StudentRecord:
+        """View of the student at a row position."""
+        return StudentRecord(self, row)
+
+    def averages(self) -> np.ndarray:
+        """Average score of every student."""
+        return self.scores.sum(axis=1) / self.scores.shape[1]
+
+    def attendance_rates(self, max_attandance: int) -> np.ndarray:
+        """Attendance percentage of every student."""
+        return self.attendance / max_attandance * 100
+
+    def split(self, parts: int) -> list["StudentTable"]:
+        """Split into at most `parts` contiguous shards of near-equal size.
+        The shards are views over the same arrays."""
+        bounds = np.linspace(0, len(self), min(parts, len(self)) + 1).astype(int)
+        return [
+            StudentTable(self.ids[start:stop], self.names[start:stop], self.attendance[start:stop], self.scores[start:stop])
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column arrays."""
+        return self.ids.nbytes + self.names.nbytes + self.attendance.nbytes + self.scores.nbytes
+
+
+def _id_column(ids) -> StringColumn | np.ndarray:
+    """Ids as a StringColumn when they are strings, an int64 array when they
+    are integers; mixed or other key types are refused rather than coerced."""
+    if isinstance(ids, StringColumn):
+        return ids
+    if isinstance(ids, np.ndarray):
+        if ids.dtype.kind in "iu":
+            return ids.astype(np.int64)
+        ids = ids.tolist()
+    ids = list(ids)
+    if all(isinstance(student_id, str) for student_id in ids):
+        return StringColumn.from_strings(ids)
+    if all(isinstance(student_id, (int, np.integer)) and not isinstance(student_id, bool) for student_id in ids):
+        return np.array(ids, dtype=np.int64)
+    raise ValueError("student ids must be all strings or all integers")
+
+
+def concat_columns(columns: Sequence):
+    """Concatenate id or name columns of several tables."""
+    if columns and isinstance(columns[0], StringColumn):
+        return StringColumn.concat(columns)
+    return np.concatenate(columns)
+
+
+def _narrow(values: np.ndarray, dtype: type, column: str) -> np.ndarray:
+    """Cast to a compact dtype, refusing values that would not fit or are
+    not whole numbers (a cast would silently truncate them)."""
+    if values.dtype.kind not in "iu" and values.size and not np.all(values == np.trunc(values)):
+        raise ValueError(f"{column} must be whole numbers")
+    info = np.iinfo(dtype)
+    if values.size and (values.min() < info.min or values.max() > info.max):
+        raise ValueError(f"{column} out of range for {np.dtype(dtype).name}")
+    return values.astype(dtype)
@@ -1,6 +1,9 @@
 from dataclasses import dataclass
-from enum import Enum
-from typing import List
+from enum import Enum, IntEnum
+from typing import TYPE_CHECKING, List, Sequence
+
+if TYPE_CHECKING:
+    from .core.grading import GradingScale
 
 
 
@@ -25,7 +28,10 @@ class Report:
         highest_score: int,
         lowest_score: int,
         average_attendance_rate: float,
-        
+        top_performers: list[tuple[str, float]] | None = None,
+        grade_distribution: dict[str, int] | None = None,
+        failed_students: Sequence[dict[str, str]] | None = None,
+        scale: "GradingScale | None" = None,
     ):
         self.students_data = students,
         self.total_students = total_students
@@ -37,6 +43,12 @@ class Report:
         self.highest_score = highest_score
         self.lowest_score = lowest_score
         self.average_attendance_rate = average_attendance_rate
+        # Precomputed print_report sections, None when not computed
+        self.top_performers = top_performers
+        self.grade_distribution = grade_distribution
+        self.failed_students = failed_students
+        # GradingScale the report was built with, None for the default scale
+        self.scale = scale
 
 report_dict_T = dict[Report]
 class SubjectStatus(Enum):
@@ -46,4 +58,11 @@ class SubjectStatus(Enum):
 class FailingCase(Enum):
     LOW_AVERAGE = "Low average"
     LOW_ATTENDANCE = "Insufficient attendance"
+
+class FailureReason(IntEnum):
+    # Compact eligibility outcome; bit 0 = low average, bit 1 = low attendance
+    PASSED = 0
+    LOW_AVERAGE = 1
+    LOW_ATTENDANCE = 2
+    BOTH = 3
     